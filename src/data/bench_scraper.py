@@ -0,0 +1,316 @@
+# bench_scraper.py
+
+"""
+Benchmark the scrape pipeline against recorded fixtures, with no network.
+
+List pages and Nominatim responses are rebuilt from the committed
+coordinate files (or list pages are taken from a real --pages-dir page
+cache) and served from a local mock_nominatim stub. Each stage is timed
+separately - fetch, parse, clean, geocode, save - followed by end-to-end
+runs of StadiumScraper and MoreStadiumScraper. For every stage we record
+best-of-N wall time, rows/s, peak traced memory and request counts.
+
+Results are appended to a JSON-lines file and compared with the previous
+entry, so a refactor that slows a stage down shows up immediately:
+
+  python bench_scraper.py --repeat 5 --results bench_results.jsonl --fail-on-regression
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from geocode_cache import GeocodeCache
+from geocoders import GeocoderChain, MockGeocoder
+from league_parse import extract_row
+from leagues import LEAGUES
+from log_setup import configure_logging
+from mock_nominatim import make_server
+from more_stadium_scraper import MoreStadiumScraper
+from page_cache import PageCache
+from rate_limit import TokenBucket
+from stadium_data import DEFAULT_DATA_DIR, load_existing_data, save_stadium_data
+from stadium_scraper import StadiumScraper
+from table_extract import extract_wikitables, find_table, iter_rows, resolve_columns
+from text_normalize import RowNormalizer
+
+DEFAULT_RESULTS = 'bench_results.jsonl'
+FILLER = '<p>' + 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 16 + '</p>\n'
+
+# ------------------------------------------------------------
+# FIXTURES
+# ------------------------------------------------------------
+def _split_location(location: str) -> Tuple[str, str]:
+    city, _, state = location.replace(',', ' ').rpartition(' ')
+    return city.strip(), state
+
+def build_page(league: str, records: Dict, pad_kb: int = 0) -> str:
+    """A wikitable page laid out per the league's spec, holding the given records."""
+    spec = LEAGUES[league]
+    width = max(spec['min_cells'], max(col[1] for col in spec['columns'].values()) + 1)
+    headers = [f"Col{i}" for i in range(width)]
+    for field, (header, index) in spec['columns'].items():
+        headers[index] = header
+    footnote = '<sup class="reference">[1]</sup>' if spec['clean'] else ''
+
+    rows = []
+    for name, record in records.items():
+        cells = [''] * width
+        values = {'stadium': f"<a>{name}</a>{footnote}", 'team': f"<a>{record['team']}</a>"}
+        if 'location' in spec['columns']:
+            values['location'] = record['location']
+        else:
+            values['city'], values['state'] = _split_location(record['location'])
+        for field, (_, index) in spec['columns'].items():
+            cells[index] = values[field]
+        rows.append('<tr>' + ''.join(f"<td>{c}</td>" for c in cells) + '</tr>')
+
+    filler = FILLER * (pad_kb * 1024 // len(FILLER))
+    return (f"<html><body>{filler}<table class=\"wikitable sortable\"><tr>"
+            + ''.join(f"<th>{h}</th>" for h in headers) + '</tr>\n'
+            + '\n'.join(rows) + f"</table>{filler}</body></html>")
+
+def normalize_cells(spec: Dict, cells: Dict[str, str]) -> Tuple[str, str, str]:
+    data = extract_row(cells)
+    return RowNormalizer.from_spec(spec).normalize(data['stadium'], data['team'], data['location'])
+
+def build_fixtures(stadiums: Dict, pad_kb: int) -> Tuple[Dict[str, str], Dict[str, List[Dict]]]:
+    """Return ({league: page html}, {geocode query: recorded Nominatim results})."""
+    pages = {}
+    geocodes = {}
+    for league in LEAGUES:
+        records = stadiums.get(league, {})
+        pages[league] = build_page(league, records, pad_kb)
+        spec = LEAGUES[league]
+        table = find_table(extract_wikitables(pages[league], spec['strip_cells']), spec['table_match'])
+        columns = resolve_columns(table.headers, spec['columns'])
+        for cells, record in zip(iter_rows(table, columns, spec['min_cells']), records.values()):
+            name, _, location = normalize_cells(spec, cells)
+            geocodes[f"{name}, {location}"] = [{
+                'lat': str(record['latitude']),
+                'lon': str(record['longitude']),
+                'display_name': record.get('display_name', ''),
+                'type': record.get('type', '')
+            }]
+    return pages, geocodes
+
+def load_real_pages(pages_dir: str) -> Dict[str, str]:
+    cache = PageCache(pages_dir, offline=True)
+    pages = {}
+    for league, spec in LEAGUES.items():
+        html, _ = cache.load(spec['url'])
+        if html is None:
+            raise SystemExit(f"No cached page for {league} in {pages_dir}")
+        pages[league] = html
+    return pages
+
+# ------------------------------------------------------------
+# MEASUREMENT
+# ------------------------------------------------------------
+def measure(fn: Callable[[], int], repeat: int, requests_fn: Callable[[], int] = lambda: 0) -> Dict:
+    """Run fn (which returns a row count) repeat times; keep the best wall time."""
+    best = None
+    for _ in range(repeat):
+        before = requests_fn()
+        tracemalloc.start()
+        start = time.perf_counter()
+        rows = fn()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result = {
+            'seconds': elapsed,
+            'rows': rows,
+            'rows_per_s': rows / elapsed if elapsed else 0.0,
+            'peak_kb': peak / 1024,
+            'requests': requests_fn() - before
+        }
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+class Bench:
+    def __init__(self, pages: Dict[str, str], geocodes: Dict[str, List[Dict]], workdir: str):
+        self.pages = pages
+        self.workdir = workdir
+        self.server = make_server(geocodes, port=0,
+                                  pages={f"/wiki/{league}": html for league, html in pages.items()})
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.session = requests.Session()
+        self.page_cache_dir = os.path.join(workdir, 'pages')
+        seeded = PageCache(self.page_cache_dir)
+        for league, html in pages.items():
+            seeded.store(LEAGUES[league]['url'], html, {})
+        self.parsed: Dict[str, List[Dict]] = {}
+        self.queries: List[str] = []
+
+    def requests_made(self) -> int:
+        return self.server.request_count + self.server.page_requests
+
+    def make_geocoder(self) -> GeocoderChain:
+        mock = MockGeocoder(self.session, f"{self.base}/search")
+        # Time the pipeline itself, not the production rate limit
+        mock.limiter = TokenBucket(1e9, capacity=1e9)
+        return GeocoderChain([mock])
+
+    def make_scraper(self, cls):
+        return cls(cache=GeocodeCache(os.path.join(self.workdir, 'geocode.sqlite')),
+                   page_cache=PageCache(self.page_cache_dir, offline=True),
+                   geocoder=self.make_geocoder())
+
+    def stage_fetch(self) -> int:
+        for league in self.pages:
+            self.session.get(f"{self.base}/wiki/{league}", timeout=10).raise_for_status()
+        return len(self.pages)
+
+    def stage_parse(self) -> int:
+        rows = 0
+        for league, html in self.pages.items():
+            spec = LEAGUES[league]
+            table = find_table(extract_wikitables(html, spec['strip_cells']), spec['table_match'])
+            columns = resolve_columns(table.headers, spec['columns'])
+            self.parsed[league] = [c for c in iter_rows(table, columns, spec['min_cells']) if c]
+            rows += len(self.parsed[league])
+        return rows
+
+    def stage_clean(self) -> int:
+        self.queries = []
+        for league, rows in self.parsed.items():
+            normalizer = RowNormalizer.from_spec(LEAGUES[league])
+            extracted = [extract_row(cells) for cells in rows]
+            for name, _, location in normalizer.normalize_table(
+                    (data['stadium'], data['team'], data['location']) for data in extracted):
+                self.queries.append(f"{name}, {location}")
+        return len(self.queries)
+
+    def stage_geocode(self) -> int:
+        geocoder = self.make_geocoder()
+        for query in self.queries:
+            geocoder.geocode(query)
+        return len(self.queries)
+
+    def stage_save(self, stadiums: Dict) -> int:
+        out = os.path.join(self.workdir, 'out')
+        os.makedirs(out, exist_ok=True)
+        for filename in sorted({spec['output'] for spec in LEAGUES.values()}):
+            dataset = {'metadata': stadiums.get('metadata', {})}
+            for league, spec in LEAGUES.items():
+                if spec['output'] == filename:
+                    dataset[league] = stadiums.get(league, {})
+            save_stadium_data(dataset, os.path.join(out, filename), force=True,
+                              backup_dir=os.path.join(self.workdir, 'backups'))
+        return sum(len(v) for k, v in stadiums.items() if k != 'metadata')
+
+    def stage_scraper(self, cls) -> int:
+        scraper = self.make_scraper(cls)
+        stadiums = scraper.scrape_stadium_coordinates()
+        return sum(len(stadiums[league]) for league in scraper.leagues)
+
+    def run(self, stadiums: Dict, repeat: int) -> Dict[str, Dict]:
+        return {
+            'fetch': measure(self.stage_fetch, repeat, self.requests_made),
+            'parse': measure(self.stage_parse, repeat),
+            'clean': measure(self.stage_clean, repeat),
+            'geocode': measure(self.stage_geocode, repeat, self.requests_made),
+            'save': measure(lambda: self.stage_save(stadiums), repeat),
+            'stadium_scraper': measure(lambda: self.stage_scraper(StadiumScraper), repeat, self.requests_made),
+            'more_stadium_scraper': measure(lambda: self.stage_scraper(MoreStadiumScraper), repeat,
+                                            self.requests_made),
+        }
+
+    def close(self) -> None:
+        self.server.shutdown()
+
+# ------------------------------------------------------------
+# RESULTS
+# ------------------------------------------------------------
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_previous(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                last = json.loads(line)
+    return last
+
+def report(stages: Dict[str, Dict], previous: Optional[Dict], threshold: float) -> List[str]:
+    """Print a results table and return the names of stages that regressed."""
+    regressions = []
+    print(f"{'stage':<22}{'seconds':>10}{'rows/s':>12}{'peak KB':>10}{'requests':>10}{'vs prev':>10}")
+    for name, r in stages.items():
+        delta = ''
+        prev = (previous or {}).get('stages', {}).get(name)
+        if prev and prev['seconds']:
+            change = r['seconds'] / prev['seconds'] - 1
+            delta = f"{change:+.0%}"
+            if change > threshold:
+                regressions.append(name)
+                delta += ' !'
+        print(f"{name:<22}{r['seconds']:>10.4f}{r['rows_per_s']:>12.0f}{r['peak_kb']:>10.0f}"
+              f"{r['requests']:>10}{delta:>10}")
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the scrape pipeline on recorded fixtures.')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='coordinate files the fixtures are built from')
+    parser.add_argument('--pages-dir', help='page cache with real saved list pages to parse instead')
+    parser.add_argument('--pad-kb', type=int, default=256, help='filler around synthetic tables, per side')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--results', default=DEFAULT_RESULTS, help='JSON-lines file results are appended to')
+    parser.add_argument('--threshold', type=float, default=0.25, help='slowdown that counts as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging(logging.WARNING)  # per-row logging would dominate the timings
+    stadiums = load_existing_data(args.data_dir)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pages, geocodes = build_fixtures(stadiums, args.pad_kb)
+        if args.pages_dir:
+            pages = load_real_pages(args.pages_dir)
+        bench = Bench(pages, geocodes, workdir)
+        try:
+            stages = bench.run(stadiums, args.repeat)
+        finally:
+            bench.close()
+
+    previous = load_previous(args.results)
+    regressions = report(stages, previous, args.threshold)
+    entry = {
+        'timestamp': datetime.now().isoformat(),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'fixtures': 'pages-dir' if args.pages_dir else f"synthetic pad_kb={args.pad_kb}",
+        'stages': stages
+    }
+    with open(args.results, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + '\n')
+    if regressions:
+        print(f"Regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# checkpoint.py
+
+"""
+Append-only journal of geocoded stadium records, so an interrupted scrape
+can be resumed without repeating its rate-limited lookups.
+
+Each line is one JSON object:
+  {"league": "ncaa", "stadium": ..., "team": ..., "location": ..., "record": {...}}
+
+A resumed run reuses a journaled record only if the row still has the same
+team and location. A line cut short by a crash is ignored. A fresh run
+never truncates a journal with records in it: the old one is moved aside
+to <path>.old first, so forgetting --resume doesn't lose the lookups.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+DEFAULT_CHECKPOINT_PATH = 'scrape_checkpoint.jsonl'
+
+class Checkpoint:
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH, resume: bool = False):
+        self.path = path
+        self.lock = threading.Lock()
+        # (league, stadium) -> (team, location, record)
+        self.entries: Dict[Tuple[str, str], Tuple[str, str, Dict]] = {}
+        self.torn = False
+        if resume:
+            self._load()
+        elif os.path.exists(path) and os.path.getsize(path):
+            aside = path + '.old'
+            os.replace(path, aside)
+            logging.warning(f"Moved the existing checkpoint to {aside}; to reuse it, move it back "
+                            f"to {path} and rerun with --resume")
+        # A fresh run starts a new journal
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+        if self.torn:
+            # Terminate the torn line so the next record starts on its own line
+            self.file.write('\n')
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            logging.warning(f"No checkpoint at {self.path}; starting from scratch")
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                self.torn = not line.endswith('\n')
+                try:
+                    entry = json.loads(line)
+                    key = (entry['league'], entry['stadium'])
+                    self.entries[key] = (entry['team'], entry['location'], entry['record'])
+                except (ValueError, KeyError, TypeError):
+                    logging.warning(f"Skipping unreadable checkpoint line {line_no} in {self.path}")
+        logging.info(f"Resuming with {len(self.entries)} checkpointed records from {self.path}")
+
+    def lookup(self, league: str, stadium: str, team: str, location: str) -> Optional[Dict]:
+        entry = self.entries.get((league, stadium))
+        if entry is None or entry[0] != team or entry[1] != location:
+            return None
+        return entry[2]
+
+    def append(self, league: str, stadium: str, team: str, location: str, record: Dict) -> None:
+        line = json.dumps({'league': league, 'stadium': stadium, 'team': team,
+                           'location': location, 'record': record})
+        with self.lock:
+            self.file.write(line + '\n')
+            # Flushed per record so a killed process loses at most the row in flight
+            self.file.flush()
+
+    def close(self) -> None:
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+    def discard(self) -> None:
+        """Close and delete the journal once its run has been saved."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
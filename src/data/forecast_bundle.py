@@ -0,0 +1,164 @@
+# forecast_bundle.py
+
+"""
+Precompute a per-venue forecast bundle from the coordinate files.
+
+Venues are snapped to a lat/lon grid so nearby venues (shared NFL/MLS
+stadiums, same-city parks) share one forecast cell; one forecast is fetched
+per unique cell through a pooled, rate-limited thread pool and written to a
+single static JSON file the frontend can load instead of calling
+OpenWeatherMap once per stadium.
+
+Usage:
+  OPENWEATHER_API_KEY=... python forecast_bundle.py --output forecast_bundle.json
+  python forecast_bundle.py --base-url http://127.0.0.1:8000/forecast --api-key test
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from log_setup import configure_logging
+from rate_limit import TokenBucket, limiter_for
+from resilience import request_with_retry
+from stadium_data import DEFAULT_DATA_DIR
+from stadium_records import load_stadiums
+
+FORECAST_URL = 'https://api.openweathermap.org/data/2.5/forecast'
+DEFAULT_GRID_DEG = 0.1  # ~11 km; well inside the forecast model's resolution
+# Only the fields the weather cards render
+FORECAST_FIELDS = ('dt', 'main', 'weather', 'wind', 'rain', 'snow')
+
+def snap_to_cell(lat: float, lon: float, grid_deg: float) -> Tuple[float, float]:
+    """
+    Nearest grid point to (lat, lon), i.e. a multiple of grid_deg on each
+    axis. Venues within half a step of the same point share one forecast.
+    """
+    return (round(round(lat / grid_deg) * grid_deg, 4),
+            round(round(lon / grid_deg) * grid_deg, 4))
+
+def cell_id(cell: Tuple[float, float]) -> str:
+    return f"{cell[0]:.4f},{cell[1]:.4f}"
+
+def group_venues(stadiums: Dict, grid_deg: float) -> Tuple[Dict[str, Tuple[float, float]], Dict[str, Dict[str, str]]]:
+    """
+    Return ({cell_id: (lat, lon)}, {league: {stadium: cell_id}}) for every
+    venue in stadiums.
+    """
+    cells = {}
+    venues = {}
+    for league, records in stadiums.items():
+        if league == 'metadata':
+            continue
+        venues[league] = {}
+        for name, record in records.items():
+            cell = snap_to_cell(record['latitude'], record['longitude'], grid_deg)
+            key = cell_id(cell)
+            cells[key] = cell
+            venues[league][name] = key
+    return cells, venues
+
+class ForecastFetcher:
+    def __init__(self, api_key: str, base_url: str = FORECAST_URL, units: str = 'imperial',
+                 max_workers: int = 8, rate: Optional[float] = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.units = units
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        # One keep-alive connection per worker
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.limiter = TokenBucket(rate) if rate else limiter_for(base_url)
+        self.requests_made = 0
+        self.failures = 0
+        self.stats_lock = threading.Lock()
+
+    def fetch_cell(self, cell: Tuple[float, float]) -> Optional[List[Dict]]:
+        lat, lon = cell
+        try:
+            with self.stats_lock:
+                self.requests_made += 1
+            resp = request_with_retry(self.session, self.base_url, 'forecast', limiter=self.limiter, params={
+                'lat': lat,
+                'lon': lon,
+                'units': self.units,
+                'appid': self.api_key
+            }, timeout=10)
+            resp.raise_for_status()
+            return [{field: slot[field] for field in FORECAST_FIELDS if field in slot}
+                    for slot in resp.json().get('list', [])]
+        except Exception as e:
+            with self.stats_lock:
+                self.failures += 1
+            logging.error(f"Error fetching forecast for cell {cell_id(cell)}: {e}")
+            return None
+
+    def fetch_cells(self, cells: Dict[str, Tuple[float, float]]) -> Dict[str, List[Dict]]:
+        keys = sorted(cells)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(lambda key: self.fetch_cell(cells[key]), keys))
+        return {key: result for key, result in zip(keys, results) if result is not None}
+
+def build_bundle(stadiums: Dict, fetcher: ForecastFetcher, grid_deg: float = DEFAULT_GRID_DEG) -> Dict:
+    cells, venues = group_venues(stadiums, grid_deg)
+    venue_count = sum(len(v) for v in venues.values())
+    logging.info(f"{venue_count} venues snapped to {len(cells)} forecast cells at {grid_deg} deg")
+
+    forecasts = fetcher.fetch_cells(cells)
+    # Drop venues whose cell failed so the client can fall back to a live request
+    venues = {league: {name: key for name, key in names.items() if key in forecasts}
+              for league, names in venues.items()}
+    return {
+        'metadata': {
+            'generated': datetime.now().isoformat(),
+            'grid_deg': grid_deg,
+            'units': fetcher.units,
+            'cells': len(forecasts),
+            'venues': sum(len(v) for v in venues.values())
+        },
+        'cells': forecasts,
+        'venues': venues
+    }
+
+def save_bundle(bundle: Dict, filename: str) -> None:
+    try:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(bundle, f, separators=(',', ':'))
+        logging.info(f"Forecast bundle saved to {filename}")
+    except Exception as e:
+        logging.error(f"Error saving forecast bundle: {e}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Fetch one forecast per grid cell for every venue.')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--output', default='forecast_bundle.json')
+    parser.add_argument('--grid-deg', type=float, default=DEFAULT_GRID_DEG)
+    parser.add_argument('--units', choices=['imperial', 'metric'], default='imperial')
+    parser.add_argument('--base-url', default=FORECAST_URL, help='forecast endpoint (e.g. a local stub)')
+    parser.add_argument('--api-key', default=os.environ.get('OPENWEATHER_API_KEY'))
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate', type=float, help='requests per second (default: per-host limit)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging()
+    if not args.api_key:
+        raise SystemExit('Set OPENWEATHER_API_KEY or pass --api-key')
+    fetcher = ForecastFetcher(args.api_key, args.base_url, args.units, args.workers, args.rate)
+    bundle = build_bundle(load_stadiums(args.data_dir), fetcher, args.grid_deg)
+    save_bundle(bundle, args.output)
+    logging.info(f"Forecast requests: {fetcher.requests_made}, failures: {fetcher.failures}")
+
+if __name__ == "__main__":
+    main()
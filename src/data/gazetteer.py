@@ -0,0 +1,114 @@
+# gazetteer.py
+
+"""
+Offline US city gazetteer: an in-memory index of city centroids keyed on
+(city, state abbreviation), loaded from the bundled us_gazetteer.csv.
+
+The bundled table holds city-centre reference points (downtown or city
+hall) for every city in the league data plus the larger US cities and
+state capitals, compiled by hand from published coordinates. It is kept
+independent of the scraped venue coordinates on purpose: the geocoders
+score candidates by their distance from these points, and a centroid
+derived from a venue would only confirm that venue's geocode. Extend or
+replace it from the Census Bureau's Gazetteer places file (internal points
+of every incorporated place and CDP):
+
+  python gazetteer.py --census 2023_Gaz_place_national.txt
+"""
+
+import argparse
+import csv
+import logging
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+from text_normalize import fold_key, parse_city_state
+from us_states import STATE_NAMES
+
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'us_gazetteer.csv')
+# Legal/statistical descriptions the Census appends to place names
+# (once: "Salt Lake City city" is Salt Lake City)
+_PLACE_SUFFIX = re.compile(r'\s+(city and borough|consolidated government|metropolitan government|'
+                           r'metro government|unified government|urban county|city|town|village|borough|'
+                           r'township|municipality|CDP)( \(balance\))?$')
+
+class Gazetteer:
+    def __init__(self, entries: Optional[Dict[Tuple[str, str], Tuple[float, float]]] = None):
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_GAZETTEER_PATH) -> 'Gazetteer':
+        entries = {}
+        if os.path.exists(path):
+            with open(path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    entries[(row['city'], row['state'])] = (float(row['lat']), float(row['lon']))
+        else:
+            logging.warning(f"Gazetteer not found at {path}; city lookups will miss")
+        return cls(entries)
+
+    def lookup(self, text: str) -> Optional[Tuple[float, float]]:
+        key = parse_city_state(text)
+        return self.entries.get(key) if key else None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def save(self, path: str = DEFAULT_GAZETTEER_PATH) -> None:
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['city', 'state', 'lat', 'lon'])
+            for (city, state), (lat, lon) in sorted(self.entries.items()):
+                writer.writerow([city, state, f"{lat:.5f}", f"{lon:.5f}"])
+
+def _place_names(name: str):
+    """Census NAME without its description; "Nashville-Davidson" also yields "Nashville"."""
+    stripped = _PLACE_SUFFIX.sub('', name)
+    yield stripped
+    if stripped != name and re.search(r'[-/]', stripped):
+        yield re.split(r'[-/]', stripped)[0]
+
+def load_census_places(path: str) -> Gazetteer:
+    """
+    Read the Census Gazetteer places file (tab-separated USPS, NAME,
+    INTPTLAT, INTPTLONG, ...). Incorporated places win over CDPs that
+    fold to the same key.
+    """
+    entries: Dict[Tuple[str, str], Tuple[float, float]] = {}
+    incorporated = set()
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f, delimiter='\t')
+        for row in reader:
+            row = {key.strip(): value.strip() for key, value in row.items() if key}
+            state = row['USPS']
+            if state not in STATE_NAMES:
+                continue
+            is_cdp = row['NAME'].endswith(' CDP')
+            point = (float(row['INTPTLAT']), float(row['INTPTLONG']))
+            for name in _place_names(row['NAME']):
+                key = (fold_key(name), state)
+                if key in entries and (is_cdp or key in incorporated):
+                    continue
+                entries[key] = point
+                if not is_cdp:
+                    incorporated.add(key)
+    return Gazetteer(entries)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Update the offline city gazetteer.')
+    parser.add_argument('--census', metavar='PATH',
+                        help='Census Gazetteer places file to merge over the current table')
+    parser.add_argument('--replace', action='store_true',
+                        help='with --census, drop entries the places file does not have')
+    parser.add_argument('--output', default=DEFAULT_GAZETTEER_PATH)
+    args = parser.parse_args(argv)
+    if args.census:
+        census = load_census_places(args.census)
+        gazetteer = Gazetteer() if args.replace else Gazetteer.load(args.output)
+        gazetteer.entries.update(census.entries)
+        gazetteer.save(args.output)
+        print(f"Wrote {len(gazetteer)} cities to {args.output} ({len(census)} from {args.census})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# geocode_cache.py
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from run_metrics import METRICS
+from text_normalize import fold_key
+
+DEFAULT_CACHE_PATH = 'geocode_cache.sqlite'
+DEFAULT_TTL = 90 * 24 * 3600  # Stadiums don't move; re-verify quarterly
+DEFAULT_NEGATIVE_TTL = 7 * 24 * 3600  # Retry failed lookups weekly
+KEY_VERSION = 1  # Bump when normalize() changes; existing keys are rewritten on open
+
+
+class GeocodeCache:
+    """
+    Persistent SQLite cache for geocode lookups, keyed on the normalized query.
+    Failed lookups are stored as negative entries with a shorter TTL so they
+    don't cost a rate-limited request on every run.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        # Shared by the scraper's worker threads; all access goes through self.lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS geocode ('
+            ' query TEXT PRIMARY KEY,'
+            ' result TEXT,'
+            ' created REAL NOT NULL)'
+        )
+        self._migrate_keys()
+        self.conn.commit()
+
+    def _migrate_keys(self) -> None:
+        """Re-key entries written under an older normalize() so they keep hitting."""
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version >= KEY_VERSION:
+            return
+        rows = self.conn.execute('SELECT query, result, created FROM geocode ORDER BY created').fetchall()
+        self.conn.execute('DELETE FROM geocode')
+        # Oldest first, so the newest entry wins when two old keys fold together
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO geocode (query, result, created) VALUES (?, ?, ?)',
+            [(self.normalize(query), result, created) for query, result, created in rows]
+        )
+        self.conn.execute(f'PRAGMA user_version = {KEY_VERSION}')
+        if rows:
+            logging.info(f"Re-keyed {len(rows)} geocode cache entries to key version {KEY_VERSION}")
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Accent-, case- and punctuation-insensitive key ("St. Louis" == "Saint Louis")."""
+        return fold_key(query)
+
+    def get(self, query: str) -> Tuple[bool, Optional[Dict]]:
+        """
+        Return (found, result). A found entry with a None result is a cached
+        negative lookup. Expired entries count as misses.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT result, created FROM geocode WHERE query = ?',
+                (self.normalize(query),)
+            ).fetchone()
+            if row:
+                result, created = row
+                ttl = self.ttl if result is not None else self.negative_ttl
+                if time.time() - created < ttl:
+                    self.hits += 1
+                    METRICS.incr('geocode_cache', result='negative_hit' if result is None else 'hit')
+                    return True, json.loads(result) if result is not None else None
+            self.misses += 1
+            METRICS.incr('geocode_cache', result='expired' if row else 'miss')
+            return False, None
+
+    def put(self, query: str, result: Optional[Dict]) -> None:
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO geocode (query, result, created) VALUES (?, ?, ?)',
+                (self.normalize(query),
+                 json.dumps(result) if result is not None else None,
+                 time.time())
+            )
+            self.conn.commit()
+
+    def log_stats(self) -> None:
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        logging.info(f"Geocode cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)")
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,255 @@
+# geocoders.py
+
+"""
+Pluggable geocoder backends and the chain that tries them in order.
+
+  nominatim  OpenStreetMap Nominatim over HTTP, behind the persistent
+             GeocodeCache and the per-host rate limiter. In offline mode it
+             answers from the cache only. Each request asks for several
+             candidates; pick_candidate() scores them and the winner
+             carries a 0-1 'confidence'.
+  gazetteer  the bundled offline city index (gazetteer.py); answers
+             "City, State" queries instantly and nothing else.
+  mock       the Nominatim protocol against a local stub server such as
+             mock_nominatim.py; uncached so it never pollutes the real cache.
+"""
+
+import logging
+import threading
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from gazetteer import Gazetteer
+from geocode_cache import GeocodeCache
+from rate_limit import limiter_for
+from resilience import TransientError, breaker_for, request_with_retry
+from run_metrics import METRICS
+from stadium_data import distance_km, validate_us_coordinates
+from text_normalize import fold_key, parse_city_state
+
+NOMINATIM_URL = 'https://nominatim.openstreetmap.org/search'
+DEFAULT_MOCK_URL = 'http://127.0.0.1:8089/search'
+DEFAULT_GEOCODERS = ['nominatim', 'gazetteer']
+DEFAULT_CANDIDATES = 5  # Nominatim's limit= per request
+
+LOW_CONFIDENCE = 0.4
+CITY_CENTROID_CONFIDENCE = 0.3
+
+# How likely an OSM feature type is to be the venue (or city) itself
+VENUE_TYPES = {'stadium': 1.0, 'sports_centre': 0.8, 'pitch': 0.7, 'ice_rink': 0.6,
+               'sports_hall': 0.6, 'track': 0.5, 'recreation_ground': 0.4}
+CITY_TYPES = {'city': 1.0, 'town': 0.9, 'administrative': 0.8, 'village': 0.8,
+              'municipality': 0.8, 'hamlet': 0.5, 'suburb': 0.5}
+# Fallback by OSM class for types not listed above
+CLASS_SCORES = {'leisure': 0.3, 'amenity': 0.2, 'building': 0.2, 'place': 0.1, 'boundary': 0.1}
+# (type, name, distance) weights
+VENUE_WEIGHTS = (0.45, 0.35, 0.2)
+CITY_WEIGHTS = (0.6, 0.2, 0.2)
+# Full distance score within NEAR_KM of the city centroid, none beyond FAR_KM
+NEAR_KM = 5.0
+FAR_KM = 50.0
+
+CANDIDATE_FIELDS = ('lat', 'lon', 'display_name', 'name', 'class', 'category', 'type', 'importance')
+
+def split_query(search_query: str, city_level: bool = False) -> Tuple[str, str]:
+    """(name the result should carry, location part) of a "Stadium, City ST" query."""
+    if city_level:
+        parsed = parse_city_state(search_query)
+        return (parsed[0] if parsed else search_query), search_query
+    name, _, location = search_query.partition(', ')
+    return name, location
+
+def score_candidate(candidate: Dict, name: str, centroid: Optional[Tuple[float, float]],
+                    city_level: bool = False) -> float:
+    """0-1 score from OSM type/class, name similarity and distance to the city centroid."""
+    types = CITY_TYPES if city_level else VENUE_TYPES
+    osm_class = candidate.get('class') or candidate.get('category', '')
+    type_score = types.get(candidate.get('type', ''), CLASS_SCORES.get(osm_class, 0.0))
+
+    candidate_name = candidate.get('name') or candidate.get('display_name', '').split(',')[0]
+    name_score = SequenceMatcher(None, fold_key(name), fold_key(candidate_name)).ratio()
+
+    if centroid is None:
+        distance_score = 0.5  # Unknown city: neither reward nor penalize
+    else:
+        distance = distance_km(float(candidate['lat']), float(candidate['lon']), *centroid)
+        distance_score = min(1.0, max(0.0, (FAR_KM - distance) / (FAR_KM - NEAR_KM)))
+
+    weights = CITY_WEIGHTS if city_level else VENUE_WEIGHTS
+    return weights[0] * type_score + weights[1] * name_score + weights[2] * distance_score
+
+def pick_candidate(search_query: str, geo_data: List[Dict],
+                   centroid: Optional[Tuple[float, float]] = None,
+                   city_level: bool = False) -> Optional[Dict]:
+    """Score the in-bounds candidates of a Nominatim response and return the best, or None."""
+    name, _ = split_query(search_query, city_level)
+    best = None
+    for candidate in geo_data or []:
+        lat, lon = float(candidate['lat']), float(candidate['lon'])
+        if not validate_us_coordinates(lat, lon):
+            METRICS.incr('invalid_bounds', stage='geocode')
+            logging.debug(f"Skipping out-of-bounds candidate for {search_query}: {lat}, {lon}")
+            continue
+        score = score_candidate(candidate, name, centroid, city_level)
+        if best is None or score > best[0]:
+            best = (score, candidate, lat, lon)
+    if best is None:
+        if geo_data:
+            logging.error(f"No candidate within US bounds for {search_query}")
+        return None
+
+    score, candidate, lat, lon = best
+    if score < LOW_CONFIDENCE:
+        METRICS.incr('low_confidence_geocodes', level='city' if city_level else 'venue')
+        logging.warning(f"Low-confidence geocode ({score:.2f}) for {search_query}: "
+                        f"{candidate.get('display_name', '')}")
+    return {
+        'lat': lat,
+        'lon': lon,
+        'display_name': candidate.get('display_name', ''),
+        'type': candidate.get('type', ''),
+        'confidence': round(score, 3)
+    }
+
+class NominatimGeocoder:
+    name = 'nominatim'
+    local = False
+
+    def __init__(self, session, cache: Optional[GeocodeCache] = None,
+                 base_url: str = NOMINATIM_URL, offline: bool = False,
+                 gazetteer: Optional[Gazetteer] = None, limit: int = DEFAULT_CANDIDATES):
+        self.session = session
+        self.cache = cache
+        self.base_url = base_url
+        self.offline = offline
+        # City centroids for the distance part of candidate scoring
+        self.gazetteer = gazetteer
+        self.limit = limit
+        # Shared per-host token bucket (~1 req/s for Nominatim) and circuit breaker
+        self.limiter = limiter_for(base_url)
+        self.breaker = breaker_for(base_url)
+
+    def _centroid(self, location: str) -> Optional[Tuple[float, float]]:
+        return self.gazetteer.lookup(location) if self.gazetteer is not None and location else None
+
+    def geocode(self, search_query: str, city_level: bool = False) -> Optional[Dict]:
+        """
+        Return the best-scoring candidate, or None if nothing was found.
+        Raises TransientError when the server is throttling or down, so the
+        miss isn't cached.
+        """
+        centroid = self._centroid(split_query(search_query, city_level)[1])
+        if self.cache is not None:
+            found, cached = self.cache.get(search_query)
+            if found:
+                if isinstance(cached, list):
+                    # Raw candidates: rescored on every read, so scoring changes need no refetch
+                    return pick_candidate(search_query, cached, centroid, city_level)
+                return cached  # Single result cached before candidate scoring
+        if self.offline:
+            return None
+
+        try:
+            encoded_query = quote(f"{search_query}, United States")  # Add USA to improve accuracy
+            geocode_url = (f"{self.base_url}?q={encoded_query}&format=json&countrycodes=us"
+                           f"&limit={self.limit}")
+            resp = request_with_retry(self.session, geocode_url, self.name,
+                                      limiter=self.limiter, breaker=self.breaker, timeout=10)
+            resp.raise_for_status()
+            candidates = [{field: c[field] for field in CANDIDATE_FIELDS if field in c}
+                          for c in resp.json()]
+            result = pick_candidate(search_query, candidates, centroid, city_level)
+            # Negative results are cached as well (with a shorter TTL)
+            if self.cache is not None:
+                self.cache.put(search_query, candidates if result is not None else None)
+            return result
+        except TransientError:
+            METRICS.incr('geocode_errors', backend=self.name, error='TransientError')
+            raise
+        except Exception as e:
+            METRICS.incr('geocode_errors', backend=self.name, error=type(e).__name__)
+            logging.error(f"Error geocoding {search_query}: {e}")
+            return None
+
+class MockGeocoder(NominatimGeocoder):
+    name = 'mock'
+
+    def __init__(self, session, base_url: str = DEFAULT_MOCK_URL,
+                 gazetteer: Optional[Gazetteer] = None):
+        super().__init__(session, cache=None, base_url=base_url, gazetteer=gazetteer)
+
+class GazetteerGeocoder:
+    name = 'gazetteer'
+    local = True
+
+    def __init__(self, gazetteer: Optional[Gazetteer] = None):
+        self.gazetteer = gazetteer if gazetteer is not None else Gazetteer.load()
+
+    def geocode(self, search_query: str, city_level: bool = False) -> Optional[Dict]:
+        point = self.gazetteer.lookup(search_query)
+        if point is None:
+            return None
+        return {
+            'lat': point[0],
+            'lon': point[1],
+            'display_name': f"{search_query} (city centroid)",
+            'type': 'city',
+            'confidence': CITY_CENTROID_CONFIDENCE
+        }
+
+class GeocoderChain:
+    """
+    Try each backend in order and return the first hit. City-level queries
+    try local backends first so fallbacks never cost a rate-limited request.
+    If no backend answers and one of them failed transiently, its
+    TransientError is re-raised so the caller can retry later.
+    """
+
+    def __init__(self, backends: Sequence):
+        self.backends = list(backends)
+        self.hits = {backend.name: 0 for backend in self.backends}
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def geocode(self, search_query: str, city_level: bool = False) -> Optional[Dict]:
+        backends = self.backends
+        if city_level:
+            backends = sorted(backends, key=lambda b: not b.local)
+        transient = None
+        for backend in backends:
+            try:
+                result = backend.geocode(search_query, city_level=city_level)
+            except TransientError as e:
+                transient = e
+                continue
+            if result:
+                with self.lock:
+                    self.hits[backend.name] += 1
+                METRICS.incr('geocoder_hits', backend=backend.name, level='city' if city_level else 'venue')
+                return result
+        if transient is not None:
+            raise transient
+        with self.lock:
+            self.misses += 1
+        METRICS.incr('geocode_unresolved', level='city' if city_level else 'venue')
+        return None
+
+    def log_stats(self) -> None:
+        hits = ', '.join(f"{name}={count}" for name, count in self.hits.items())
+        logging.info(f"Geocoder hits: {hits}; unresolved: {self.misses}")
+
+def build_chain(names: Sequence[str], session, cache: Optional[GeocodeCache] = None,
+                offline: bool = False, mock_url: str = DEFAULT_MOCK_URL) -> GeocoderChain:
+    backends = []
+    gazetteer = Gazetteer.load()
+    for name in names:
+        if name == 'nominatim':
+            backends.append(NominatimGeocoder(session, cache, offline=offline, gazetteer=gazetteer))
+        elif name == 'gazetteer':
+            backends.append(GazetteerGeocoder(gazetteer))
+        elif name == 'mock':
+            backends.append(MockGeocoder(session, mock_url, gazetteer=gazetteer))
+        else:
+            raise ValueError(f"Unknown geocoder backend: {name}")
+    return GeocoderChain(backends)
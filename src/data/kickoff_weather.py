@@ -0,0 +1,309 @@
+# kickoff_weather.py
+
+"""
+Forecast conditions at kickoff for a whole schedule at once.
+
+A schedule is a CSV with columns league, stadium (or team) and kickoff
+(ISO 8601 with a UTC offset, or Unix seconds; naive times are read as UTC).
+Games are joined to venues from the coordinate files, venues to forecast
+cells as in forecast_bundle.py, and every game is interpolated in one pass:
+the 5-day/3-hour series of all needed cells are packed into (cells x slots)
+arrays and each game reads the two slots around its kickoff. Numeric fields
+are interpolated linearly (wind direction through its u/v components); the
+condition code and icon come from the nearest slot. The output has one row
+per scheduled game, in schedule order; a game without conditions has nulls
+and a status saying why: 'out_of_range' (kickoff outside the forecast) or
+'no_forecast' (no forecast for its cell).
+
+Forecasts come from a forecast_bundle.py output or are fetched live for
+just the cells the schedule needs:
+
+  python kickoff_weather.py --schedule week7.csv --bundle forecast_bundle.json
+  python kickoff_weather.py --schedule week7.csv --base-url http://127.0.0.1:8089/forecast --api-key test
+
+Output is one compact bundle: {"metadata": {...}, "fields": [...], "games": [[...], ...]}.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from forecast_bundle import DEFAULT_GRID_DEG, FORECAST_URL, ForecastFetcher, cell_id, snap_to_cell
+from log_setup import configure_logging
+from stadium_data import DEFAULT_DATA_DIR
+from stadium_records import load_stadiums
+from text_normalize import fold_key
+
+SLOT_SECONDS = 3 * 3600
+# Output name -> path into an OpenWeatherMap forecast slot
+NUMERIC_FIELDS = (
+    ('temp', ('main', 'temp')),
+    ('feels_like', ('main', 'feels_like')),
+    ('humidity', ('main', 'humidity')),
+    ('pressure', ('main', 'pressure')),
+    ('wind_speed', ('wind', 'speed')),
+    ('wind_gust', ('wind', 'gust')),
+    ('rain_3h', ('rain', '3h')),
+    ('snow_3h', ('snow', '3h')),
+)
+# Absent from a slot means none fell, not unknown
+ZERO_WHEN_MISSING = {'rain_3h', 'snow_3h'}
+GAME_FIELDS = ['league', 'stadium', 'kickoff', 'venue_id'] + [name for name, _ in NUMERIC_FIELDS] + \
+              ['wind_deg', 'weather_id', 'icon', 'status']
+
+# (league, stadium, kickoff, venue_id, cell id)
+ScheduledGame = Tuple[str, str, int, Optional[str], str]
+
+def parse_kickoff(value: str) -> int:
+    value = value.strip()
+    if value.lstrip('-').isdigit():
+        return int(value)
+    kickoff = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if kickoff.tzinfo is None:
+        kickoff = kickoff.replace(tzinfo=timezone.utc)
+    return int(kickoff.timestamp())
+
+def load_schedule(path: str) -> List[Dict[str, str]]:
+    with open(path, newline='', encoding='utf-8') as f:
+        return [{k.strip().lower(): (v or '').strip() for k, v in row.items() if k} for row in csv.DictReader(f)]
+
+class ForecastArrays:
+    """Forecast series of many cells packed into padded (cells x slots) arrays."""
+
+    def __init__(self, forecasts: Dict[str, List[Dict]]):
+        self.keys = sorted(forecasts)
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        cells = len(self.keys)
+        slots = max((len(series) for series in forecasts.values()), default=0)
+        self.counts = np.zeros(cells, dtype=np.int64)
+        # Padding sorts after every real slot so searches never land in it
+        self.times = np.full((cells, slots), np.iinfo(np.int64).max, dtype=np.int64)
+        self.values = np.full((len(NUMERIC_FIELDS), cells, slots), np.nan)
+        self.wind_u = np.full((cells, slots), np.nan)
+        self.wind_v = np.full((cells, slots), np.nan)
+        self.weather_ids = np.zeros((cells, slots), dtype=np.int64)
+        self.icons = np.full((cells, slots), None, dtype=object)
+        if not cells:
+            return
+
+        # One flat pass over every slot, then a single scatter into the arrays
+        paths = [path for _, path in NUMERIC_FIELDS] + [('wind', 'deg')]
+        rows, cell_idx, slot_idx, times, ids, icons = [], [], [], [], [], []
+        for c, key in enumerate(self.keys):
+            series = sorted(forecasts[key], key=lambda slot: slot['dt'])
+            self.counts[c] = len(series)
+            for t, slot in enumerate(series):
+                rows.append([(slot.get(group) or {}).get(field) for group, field in paths])
+                weather = (slot.get('weather') or [{}])[0]
+                cell_idx.append(c)
+                slot_idx.append(t)
+                times.append(slot['dt'])
+                ids.append(weather.get('id', 0))
+                icons.append(weather.get('icon'))
+        if not rows:
+            return
+
+        table = np.array(rows, dtype=np.float64)  # None becomes NaN
+        for f, (name, _) in enumerate(NUMERIC_FIELDS):
+            if name in ZERO_WHEN_MISSING:
+                table[:, f] = np.nan_to_num(table[:, f], nan=0.0)
+        self.values[:, cell_idx, slot_idx] = table[:, :len(NUMERIC_FIELDS)].T
+        speed = table[:, paths.index(('wind', 'speed'))]
+        deg = np.radians(table[:, -1])
+        self.wind_u[cell_idx, slot_idx] = speed * np.sin(deg)
+        self.wind_v[cell_idx, slot_idx] = speed * np.cos(deg)
+        self.times[cell_idx, slot_idx] = times
+        self.weather_ids[cell_idx, slot_idx] = ids
+        self.icons[cell_idx, slot_idx] = icons
+
+    def interpolate(self, cells: np.ndarray, kickoffs: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Conditions for game g at kickoffs[g] in cell row cells[g]. Returns
+        one array per output field plus 'valid' (kickoff within the series).
+        """
+        times = self.times[cells]
+        counts = self.counts[cells]
+        rows = np.arange(len(cells))
+        # Index of the last slot at or before kickoff, kept where slot i+1 exists
+        lower = np.clip((times <= kickoffs[:, None]).sum(axis=1) - 1, 0, np.maximum(counts - 2, 0))
+        upper = np.minimum(lower + 1, np.maximum(counts - 1, 0))
+        t0, t1 = times[rows, lower], times[rows, upper]
+        span = np.where(t1 > t0, t1 - t0, 1)
+        weight = np.clip((kickoffs - t0) / span, 0.0, 1.0)
+        last = times[rows, np.maximum(counts - 1, 0)]
+        # A kickoff up to one slot before the first forecast still reads the first slot
+        valid = (counts > 0) & (kickoffs >= t0 - SLOT_SECONDS) & (kickoffs <= last)
+
+        def blend(array: np.ndarray) -> np.ndarray:
+            a, b = array[..., cells, lower], array[..., cells, upper]
+            # A gap on either side falls back to the other slot
+            a, b = np.where(np.isnan(a), b, a), np.where(np.isnan(b), a, b)
+            return a + weight * (b - a)
+
+        out = {name: values for (name, _), values in zip(NUMERIC_FIELDS, blend(self.values))}
+        u, v = blend(self.wind_u), blend(self.wind_v)
+        out['wind_deg'] = np.mod(np.degrees(np.arctan2(u, v)), 360.0)
+        nearest = np.where(weight < 0.5, lower, upper)
+        out['weather_id'] = self.weather_ids[cells, nearest]
+        out['icon'] = self.icons[cells, nearest]
+        out['valid'] = valid
+        return out
+
+class VenueLookup:
+    """Schedule rows -> coordinate-file venues, by stadium name or team."""
+
+    def __init__(self, stadiums: Dict):
+        self.by_name: Dict[str, Dict[str, Tuple[str, Dict]]] = {}
+        self.by_team: Dict[str, Dict[str, Tuple[str, Dict]]] = {}
+        for league, records in stadiums.items():
+            if league == 'metadata':
+                continue
+            names = self.by_name[league] = {}
+            teams = self.by_team[league] = {}
+            for name, record in records.items():
+                names[fold_key(name)] = (name, record)
+                # Shared stadiums list their tenants as "Team A, Team B" or "Team A/Team B"
+                for team in record.get('team', '').replace('/', ',').split(','):
+                    if team.strip():
+                        teams.setdefault(fold_key(team), (name, record))
+
+    def resolve(self, league: str, stadium: str = '', team: str = '') -> Optional[Tuple[str, Dict]]:
+        if stadium:
+            venue = self.by_name.get(league, {}).get(fold_key(stadium))
+            if venue:
+                return venue
+        if team:
+            return self.by_team.get(league, {}).get(fold_key(team))
+        return None
+
+def join_schedule(schedule: Sequence[Dict[str, str]], lookup: VenueLookup,
+                  grid_deg: float) -> Tuple[List[ScheduledGame], Dict[str, Tuple[float, float]], int]:
+    """Return (games, {cell id: (lat, lon)} they play in, rows skipped)."""
+    games = []
+    cells = {}
+    skipped = 0
+    for line_no, row in enumerate(schedule, 2):
+        league = row.get('league', '').lower()
+        venue = lookup.resolve(league, row.get('stadium', ''), row.get('team', ''))
+        if venue is None:
+            skipped += 1
+            logging.warning(f"Schedule line {line_no}: no {league.upper()} venue for "
+                            f"{row.get('stadium') or row.get('team')!r}")
+            continue
+        try:
+            kickoff = parse_kickoff(row.get('kickoff', ''))
+        except ValueError:
+            skipped += 1
+            logging.warning(f"Schedule line {line_no}: unreadable kickoff {row.get('kickoff')!r}")
+            continue
+        name, record = venue
+        cell = snap_to_cell(record['latitude'], record['longitude'], grid_deg)
+        cells[cell_id(cell)] = cell
+        games.append((league, name, kickoff, record.get('venue_id'), cell_id(cell)))
+    return games, cells, skipped
+
+def _round(value, digits: int = 1):
+    return None if np.isnan(value) else round(float(value), digits)
+
+def kickoff_bundle(games: Sequence[ScheduledGame],
+                   forecasts: Dict[str, List[Dict]], units: Optional[str] = None) -> Dict:
+    start = time.perf_counter()
+    covered = [game for game in games if game[4] in forecasts]
+    arrays = ForecastArrays({game[4]: forecasts[game[4]] for game in covered})
+    packed = time.perf_counter()
+    cells = np.fromiter((arrays.index[game[4]] for game in covered), dtype=np.int64, count=len(covered))
+    kickoffs = np.fromiter((game[2] for game in covered), dtype=np.int64, count=len(covered))
+    conditions = arrays.interpolate(cells, kickoffs)
+
+    columns = [[_round(v) for v in conditions[name]] for name, _ in NUMERIC_FIELDS]
+    # Rounded before wrapping so a northerly reads 0, not 360
+    columns.append([_round(v, 0) for v in np.mod(np.round(conditions['wind_deg']), 360.0)])
+    columns.append(conditions['weather_id'].tolist())
+    columns.append(conditions['icon'].tolist())
+    empty = [None] * len(columns)
+    rows = []
+    g = 0
+    for league, name, kickoff, venue_id, cell in games:
+        if cell not in forecasts:
+            values, status = empty, 'no_forecast'
+        else:
+            valid = conditions['valid'][g]
+            values = [column[g] for column in columns] if valid else empty
+            status = 'ok' if valid else 'out_of_range'
+            g += 1
+        rows.append([league, name, kickoff, venue_id] + values + [status])
+    done = time.perf_counter()
+
+    logging.info(f"Interpolated {len(covered)} games over {len(arrays.keys)} forecast cells in "
+                 f"{(done - start) * 1000:.1f} ms ({(packed - start) * 1000:.1f} ms packing the series)")
+    return {
+        'metadata': {
+            'generated': datetime.now().isoformat(),
+            'units': units,
+            'games': len(rows),
+            'in_range': int(conditions['valid'].sum()),
+            'without_forecast': len(games) - len(covered)
+        },
+        'fields': GAME_FIELDS,
+        'games': rows
+    }
+
+def load_forecasts(path: str) -> Tuple[Dict[str, List[Dict]], float, Optional[str]]:
+    """(cells, grid_deg, units) from a forecast_bundle.py output."""
+    with open(path, encoding='utf-8') as f:
+        bundle = json.load(f)
+    metadata = bundle.get('metadata', {})
+    return bundle['cells'], metadata.get('grid_deg', DEFAULT_GRID_DEG), metadata.get('units')
+
+def save_kickoff_bundle(bundle: Dict, filename: str) -> None:
+    try:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(bundle, f, separators=(',', ':'))
+        logging.info(f"Kickoff forecasts saved to {filename}")
+    except Exception as e:
+        logging.error(f"Error saving kickoff forecasts: {e}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Interpolate forecast conditions at kickoff for a schedule.')
+    parser.add_argument('--schedule', required=True, help='CSV with league, stadium or team, kickoff')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--output', default='kickoff_forecasts.json')
+    parser.add_argument('--bundle', help='forecast_bundle.py output to read forecasts from')
+    parser.add_argument('--grid-deg', type=float, default=DEFAULT_GRID_DEG, help='cell size when fetching live')
+    parser.add_argument('--units', choices=['imperial', 'metric'], default='imperial')
+    parser.add_argument('--base-url', default=FORECAST_URL, help='forecast endpoint (e.g. a local stub)')
+    parser.add_argument('--api-key', default=os.environ.get('OPENWEATHER_API_KEY'))
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate', type=float, help='requests per second (default: per-host limit)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging()
+    lookup = VenueLookup(load_stadiums(args.data_dir))
+    schedule = load_schedule(args.schedule)
+
+    if args.bundle:
+        forecasts, grid_deg, units = load_forecasts(args.bundle)
+        games, _, skipped = join_schedule(schedule, lookup, grid_deg)
+    else:
+        if not args.api_key:
+            raise SystemExit('Pass --bundle, or set OPENWEATHER_API_KEY / --api-key to fetch forecasts')
+        games, cells, skipped = join_schedule(schedule, lookup, args.grid_deg)
+        fetcher = ForecastFetcher(args.api_key, args.base_url, args.units, args.workers, args.rate)
+        # Only the cells this schedule plays in
+        forecasts, units = fetcher.fetch_cells(cells), args.units
+
+    bundle = kickoff_bundle(games, forecasts, units)
+    bundle['metadata']['skipped'] = skipped
+    save_kickoff_bundle(bundle, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# league_parse.py
+
+"""
+CPU-bound half of a league pass: list-page HTML in, normalized
+(stadium, team, location) rows out. Holds no scraper state and imports no
+HTTP code, so LeagueScraper can run it in worker processes (one page per
+task) while geocoding stays in the parent behind its single rate limiter.
+"""
+
+import logging
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from leagues import LEAGUES
+from table_extract import extract_wikitables, find_table, iter_rows, resolve_columns
+from text_normalize import RowNormalizer
+
+class ParsedPage(NamedTuple):
+    table_rows: int  # rows in the stadium table, before filtering
+    rows: List[Tuple[str, str, str]]  # normalized (stadium, team, location), in table order
+    incomplete: int  # rows missing a stadium, team or location
+    errors: int  # rows that raised while being extracted
+
+def extract_row(cells: Optional[Dict[str, str]]) -> Optional[Dict]:
+    if cells is None:
+        return None
+    if 'location' in cells:
+        location = cells['location']
+    else:
+        location = f"{cells['city']}, {cells['state']}"
+    return {'stadium': cells['stadium'], 'team': cells['team'], 'location': location}
+
+def parse_league_page(league: str, html: str) -> Optional[ParsedPage]:
+    """Parse and normalize one league's list page; None if its table isn't there."""
+    spec = LEAGUES[league]
+    name = league.upper()
+    tables = extract_wikitables(html, strip_cells=spec['strip_cells'])
+    table = find_table(tables, spec['table_match'])
+    if not table:
+        return None
+
+    columns = resolve_columns(table.headers, spec['columns'])
+    pending = []
+    incomplete = errors = 0
+    for idx, cells in enumerate(iter_rows(table, columns, spec['min_cells']), 1):
+        try:
+            data = extract_row(cells)
+            if data:
+                logging.debug(f"{name} row {idx}: stadium={data['stadium']}, "
+                              f"team={data['team']}, location={data['location']}")
+                if data['stadium'] and data['team'] and data['location']:
+                    pending.append((data['stadium'], data['team'], data['location']))
+                else:
+                    incomplete += 1
+        except Exception as e:
+            errors += 1
+            logging.error(f"Error processing {name} row {idx}: {e}")
+
+    rows = RowNormalizer.from_spec(spec).normalize_table(pending)
+    return ParsedPage(len(table.rows), rows, incomplete, errors)
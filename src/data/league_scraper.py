@@ -0,0 +1,510 @@
+# league_scraper.py
+
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+import logging
+import multiprocessing
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from checkpoint import DEFAULT_CHECKPOINT_PATH, Checkpoint
+from geocode_cache import GeocodeCache
+from geocoders import DEFAULT_GEOCODERS, DEFAULT_MOCK_URL, GeocoderChain, build_chain
+from league_parse import parse_league_page
+from leagues import LEAGUES
+from log_setup import SCRAPER_LOG, configure_logging
+from page_cache import DEFAULT_PAGE_CACHE_DIR, PageCache
+from resilience import TransientError
+from run_metrics import METRICS
+from stadium_data import (
+    DEFAULT_DATA_DIR,
+    load_existing_data,
+    rollback_stadium_data,
+    save_stadium_data,
+    validate_us_coordinates,
+)
+from text_normalize import fold_key, location_key
+from venue_bundle import write_bundles
+from venue_dedupe import annotate_venues, venue_key
+from venue_regions import DEFAULT_BOUNDARIES_PATH, BoundaryIndex, enrich_stadiums
+
+DEFAULT_MAX_AGE_DAYS = 30
+
+class LeagueScraper:
+    """
+    Scrape any set of leagues from LEAGUES in one process, sharing one pooled
+    HTTP session, one geocode rate limiter and one geocode cache.
+    Geocoding goes through a GeocoderChain (Nominatim, then the offline
+    gazetteer, by default). With parse_workers > 0, list pages are parsed
+    and normalized in that many worker processes; geocoding always stays in
+    this process so every lookup shares one rate limiter. With a
+    Checkpoint, every geocoded record is journaled as it completes, and rows
+    already in a resumed journal are not geocoded again.
+    """
+
+    def __init__(self, leagues: Optional[Iterable[str]] = None,
+                 cache: Optional[GeocodeCache] = None,
+                 previous: Optional[Dict] = None,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                 page_cache: Optional[PageCache] = None,
+                 geocoder: Optional[GeocoderChain] = None,
+                 checkpoint: Optional[Checkpoint] = None,
+                 parse_workers: int = 0):
+        self.leagues = list(leagues) if leagues is not None else list(LEAGUES)
+        # Incremental mode: rows matching a fresh previous record skip geocoding
+        self.previous = previous
+        # Previous names by fold_key, so "St. Louis" and "St Louis" rows still match
+        self.previous_names = {league: {fold_key(n): n for n in records}
+                               for league, records in (previous or {}).items()}
+        self.max_age = timedelta(days=max_age_days)
+        self.report = {league: {'added': [], 'changed': [], 'stale': [], 'unchanged': [], 'removed': []}
+                       for league in self.leagues}
+        self.report_lock = threading.Lock()
+        import requests  # deferred so the thin entry points import without it
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'StadiumCoordinateCollector/1.0 (Educational Purpose)'
+        })
+        self.cache = cache if cache is not None else GeocodeCache()
+        self.page_cache = page_cache if page_cache is not None else PageCache()
+        self.geocoder = geocoder if geocoder is not None else build_chain(
+            DEFAULT_GEOCODERS, self.session, self.cache)
+        self.checkpoint = checkpoint
+        self.max_workers = 4
+        self.row_pool = None
+        self.parse_workers = parse_workers
+        self.parse_pool = None
+        # Rows whose geocode hit a throttled or unavailable upstream, retried
+        # once at the end of the run: (league, name, team, location, previous, out)
+        self.dead_letters = []
+        self.dead_letters_lock = threading.Lock()
+        self.row_partials: Dict[str, List[Dict]] = {}
+        # venue_key -> Future of the venue-level geocode, so a stadium listed by
+        # several leagues costs one lookup per run
+        self.venue_geocodes: Dict[Tuple[str, str], Future] = {}
+        self.venue_lock = threading.Lock()
+
+    def scrape_stadium_coordinates(self) -> Dict:
+        """
+        Scrape every configured league. Return a dict of the form:
+        {
+          'metadata': {...},
+          '<league>': {stadium_name: {...}},
+          ...
+        }
+        """
+        stadiums = {
+            'metadata': {
+                'last_updated': datetime.now().isoformat(),
+                'version': '1.0'
+            }
+        }
+        for league in self.leagues:
+            stadiums[league] = {}
+
+        # All league pages download concurrently and feed one geocode pool,
+        # so total time is bounded by the geocoder's rate limit
+        logging.info(f"Starting stadium scraping for: {', '.join(self.leagues)}")
+        if self.parse_workers:
+            # spawn, not fork: the page and row threads may hold locks when a worker starts
+            self.parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers,
+                                                  mp_context=multiprocessing.get_context('spawn'))
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as self.row_pool, \
+                    ThreadPoolExecutor(max_workers=len(self.leagues) or 1) as page_pool:
+                futures = [page_pool.submit(self._scrape_league, league, stadiums)
+                           for league in self.leagues]
+                for future in futures:
+                    future.result()
+                self._retry_dead_letters(stadiums)
+        finally:
+            self.row_pool = None
+            if self.parse_pool is not None:
+                self.parse_pool.shutdown()
+                self.parse_pool = None
+
+        return stadiums
+
+    def _scrape_league(self, league: str, stadiums: Dict) -> None:
+        spec = LEAGUES[league]
+        name = league.upper()
+        try:
+            with METRICS.span('fetch', league=league):
+                html, changed = self.page_cache.fetch(self.session, spec['url'])
+            if (not changed and self.previous is not None and self.previous.get(league) and
+                    not any(self._is_stale(r) for r in self.previous[league].values())):
+                # Page unchanged and every record fresh: skip the league pass. With a stale
+                # record, the cached page goes through the normal diff so it is re-geocoded
+                logging.info(f"{name} page not modified, reusing previous records")
+                self._carry_over_previous(league, stadiums)
+                return
+            # Parse, extract and normalize (in a worker process if there is a pool)
+            with METRICS.span('parse', league=league):
+                if self.parse_pool is not None:
+                    parsed = self.parse_pool.submit(parse_league_page, league, html).result()
+                else:
+                    parsed = parse_league_page(league, html)
+            if parsed is None:
+                if spec['required']:
+                    raise ValueError(f"{name} stadium table not found")
+                logging.warning(f"{name} stadium table not found on the page.")
+                self._carry_over_previous(league, stadiums)
+                return
+
+            logging.info(f"Found {parsed.table_rows} {name} stadiums to process")
+            if parsed.incomplete:
+                METRICS.incr('rows', parsed.incomplete, league=league, result='incomplete')
+            if parsed.errors:
+                METRICS.incr('rows', parsed.errors, league=league, result='error')
+            self._process_rows(league, parsed.rows, stadiums)
+            if self.previous is not None:
+                self._record_removed(league)
+
+        except Exception as e:
+            METRICS.incr('league_errors', league=league)
+            logging.error(f"Error scraping {name} stadiums: {e}")
+            if spec['required']:
+                raise
+
+    def _process_rows(self, league: str, rows: List[Tuple[str, str, str]], stadiums: Dict) -> None:
+        """
+        Geocode normalized (stadium, team, location) rows on the shared pool.
+        Each row writes into its own partial dict; results are merged in table
+        order so the output stays deterministic.
+        """
+        partials = [{} for _ in rows]
+        self.row_partials[league] = partials
+        futures = [self.row_pool.submit(self._process_stadium, league, row, partial)
+                   for row, partial in zip(rows, partials)]
+        for future in futures:
+            future.result()
+        for partial in partials:
+            stadiums[league].update(partial)
+
+    def _process_stadium(self, league: str, row: Tuple[str, str, str], out: Dict) -> None:
+        name = league.upper()
+        stadium_name, team, location = row
+        try:
+            previous_record = None
+            if self.previous is not None:
+                status, previous_record = self._diff_row(league, stadium_name, team, location)
+                if status == 'unchanged':
+                    out[stadium_name] = previous_record
+                    METRICS.incr('rows', league=league, result='reused')
+                    return
+
+            if self.checkpoint is not None:
+                record = self.checkpoint.lookup(league, stadium_name, team, location)
+                if record is not None:
+                    out[stadium_name] = record
+                    METRICS.incr('rows', league=league, result='resumed')
+                    return
+
+            self._geocode_row(league, stadium_name, team, location, previous_record, out)
+        except Exception as e:
+            METRICS.incr('rows', league=league, result='error')
+            logging.error(f"Error processing {name} stadium {stadium_name}: {e}")
+
+    def _geocode_row(self, league: str, stadium_name: str, team: str, location: str,
+                     previous_record: Optional[Dict], out: Dict, final: bool = False) -> None:
+        """
+        Geocode one normalized row into out. On the first pass a transient
+        upstream failure queues the row as a dead letter; on the final pass
+        it counts as a miss (so the city-level fallback still gets a chance).
+        """
+        spec = LEAGUES[league]
+        name = league.upper()
+        logging.debug(f"Geocoding {name} stadium: {stadium_name} in {location}")
+        try:
+            with METRICS.span('geocode', league=league):
+                coordinates = self._geocode_venue(stadium_name, location, final)
+
+                # If first attempt fails, try with just city and state (local backends first)
+                if not coordinates and spec['fallback_to_location']:
+                    logging.debug(f"Retrying with just location: {location}")
+                    METRICS.incr('geocode_fallbacks', league=league)
+                    coordinates = self._try_geocode(location, city_level=True, final=final)
+        except TransientError as e:
+            logging.warning(f"{e}; will retry {name} stadium {stadium_name} at the end of the run")
+            with self.dead_letters_lock:
+                self.dead_letters.append((league, stadium_name, team, location, previous_record, out))
+            METRICS.incr('dead_letters', league=league, result='queued')
+            return
+        if final:
+            METRICS.incr('dead_letters', league=league, result='recovered' if coordinates else 'failed')
+
+        if coordinates:
+            record = {
+                'location': location,
+                'team': team,
+                'latitude': coordinates['lat'],
+                'longitude': coordinates['lon'],
+                'display_name': coordinates.get('display_name', ''),
+                'type': coordinates.get('type', ''),
+                'confidence': coordinates.get('confidence'),
+                'last_verified': datetime.now().isoformat()
+            }
+            out[stadium_name] = record
+            if self.checkpoint is not None:
+                self.checkpoint.append(league, stadium_name, team, location, record)
+            METRICS.incr('rows', league=league, result='geocoded')
+        elif previous_record is not None:
+            # Keep the stale record rather than dropping the venue
+            logging.error(f"Failed to re-verify {name} stadium, keeping previous record: {stadium_name}")
+            out[stadium_name] = previous_record
+            METRICS.incr('rows', league=league, result='kept_previous')
+        else:
+            logging.error(f"Failed to geocode {name} stadium: {stadium_name}")
+            METRICS.incr('rows', league=league, result='failed')
+
+    def _geocode_venue(self, stadium_name: str, location: str, final: bool = False) -> Optional[Dict]:
+        """Venue-level lookup, shared by every league row with the same venue_key."""
+        key = venue_key(stadium_name, location)
+        with self.venue_lock:
+            future = self.venue_geocodes.get(key)
+            owner = future is None
+            if owner:
+                future = self.venue_geocodes[key] = Future()
+        if not owner:
+            METRICS.incr('venue_geocodes_shared')
+            return future.result()
+        try:
+            result = self._try_geocode(f"{stadium_name}, {location}", final=final)
+        except BaseException as e:
+            # Let a later attempt (e.g. the dead-letter pass) try again
+            with self.venue_lock:
+                del self.venue_geocodes[key]
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+    def _try_geocode(self, search_query: str, city_level: bool = False, final: bool = False) -> Optional[Dict]:
+        try:
+            return self._geocode_location(search_query, city_level=city_level)
+        except TransientError as e:
+            if not final:
+                raise
+            logging.error(f"Giving up on {search_query}: {e}")
+            return None
+
+    def _retry_dead_letters(self, stadiums: Dict) -> None:
+        """
+        Retry the dead-lettered rows once every league pass is done (by then the
+        circuit breaker has let the upstream recover), then re-merge the
+        affected leagues so recovered rows keep their table position.
+        """
+        with self.dead_letters_lock:
+            rows, self.dead_letters = self.dead_letters, []
+        if not rows:
+            return
+        logging.info(f"Retrying {len(rows)} dead-lettered rows")
+        futures = [self.row_pool.submit(self._geocode_row, *row, final=True) for row in rows]
+        for row, future in zip(rows, futures):
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f"Error retrying {row[0].upper()} stadium {row[1]}: {e}")
+        for league in {row[0] for row in rows}:
+            merged = {}
+            for partial in self.row_partials[league]:
+                merged.update(partial)
+            stadiums[league] = merged
+
+    # ------------------------------------------------------------
+    # INCREMENTAL REFRESH
+    # ------------------------------------------------------------
+    def _diff_row(self, league: str, stadium_name: str, team: str, location: str):
+        """
+        Classify a parsed row against the previous dataset as added, changed,
+        stale or unchanged. Returns (status, previous record or None); the
+        record is only returned when it may be reused.
+        """
+        previous_name = self.previous_names.get(league, {}).get(fold_key(stadium_name))
+        record = self.previous[league].get(previous_name) if previous_name is not None else None
+        if record is None:
+            status = 'added'
+        elif (fold_key(record.get('team', '')) != fold_key(team) or
+              location_key(record.get('location', '')) != location_key(location)):
+            status = 'changed'
+            record = None
+        elif self._is_stale(record):
+            status = 'stale'
+        else:
+            status = 'unchanged'
+        with self.report_lock:
+            self.report[league][status].append(stadium_name)
+        return status, record
+
+    def _is_stale(self, record: Dict) -> bool:
+        try:
+            verified = datetime.fromisoformat(record['last_verified'])
+        except (KeyError, TypeError, ValueError):
+            return True
+        return datetime.now() - verified > self.max_age
+
+    def _record_removed(self, league: str) -> None:
+        report = self.report[league]
+        seen = {fold_key(n) for n in report['added'] + report['changed'] + report['stale'] + report['unchanged']}
+        report['removed'] = [n for n in self.previous.get(league, {}) if fold_key(n) not in seen]
+
+    def _carry_over_previous(self, league: str, stadiums: Dict) -> None:
+        """Keep a league's previous records when its page is unchanged or couldn't be parsed"""
+        if self.previous is not None and self.previous.get(league):
+            logging.info(f"Keeping {len(self.previous[league])} previous {league.upper()} records")
+            stadiums[league] = dict(self.previous[league])
+            self.report[league]['unchanged'] = list(self.previous[league])
+            METRICS.incr('rows', len(self.previous[league]), league=league, result='reused')
+
+    def log_change_report(self) -> None:
+        for league in self.leagues:
+            report = self.report[league]
+            logging.info(
+                f"{league.upper()} changes: {len(report['added'])} added, "
+                f"{len(report['changed'])} changed, {len(report['stale'])} stale, "
+                f"{len(report['unchanged'])} unchanged, {len(report['removed'])} removed"
+            )
+            for status in ('added', 'changed', 'stale', 'removed'):
+                for stadium_name in sorted(report[status]):
+                    logging.info(f"  {status}: {stadium_name}")
+
+    # ------------------------------------------------------------
+    # HELPER FUNCTIONS
+    # ------------------------------------------------------------
+    def _geocode_location(self, search_query: str, city_level: bool = False) -> Optional[Dict]:
+        """
+        Geocode a location through the backend chain. Only valid US coordinates are accepted.
+        """
+        return self.geocoder.geocode(search_query, city_level=city_level)
+
+    def _validate_us_coordinates(self, lat: float, lon: float) -> bool:
+        """
+        Check if lat/lon is in the continental US, Alaska, or Hawaii bounds.
+        """
+        return validate_us_coordinates(lat, lon)
+
+def split_by_output(stadiums: Dict) -> Dict[str, Dict]:
+    """Group a scrape result into {output filename: dataset} using each league's spec."""
+    outputs = {}
+    for league, spec in LEAGUES.items():
+        if league not in stadiums:
+            continue
+        dataset = outputs.setdefault(spec['output'], {'metadata': dict(stadiums['metadata'])})
+        dataset[league] = stadiums[league]
+    return outputs
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Scrape stadium coordinates for every league.')
+    parser.add_argument('--leagues', nargs='+', choices=list(LEAGUES), default=list(LEAGUES))
+    parser.add_argument('--output-dir', default='.', help='where the JSON files are written')
+    parser.add_argument('--backup-dir',
+                        help='where replaced files are kept for --rollback (default: a per-output-dir '
+                             'folder under data_backups/)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only geocode rows that are new, changed or stale vs. --data-dir')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help='existing coordinate files used by --incremental')
+    parser.add_argument('--max-age-days', type=float, default=DEFAULT_MAX_AGE_DAYS,
+                        help='re-geocode records whose last_verified is older than this')
+    parser.add_argument('--report', help='write the incremental change report to this JSON file')
+    parser.add_argument('--page-cache-dir', default=DEFAULT_PAGE_CACHE_DIR,
+                        help='raw list-page HTML and ETag/Last-Modified headers')
+    parser.add_argument('--offline', action='store_true',
+                        help='replay list pages from the page cache without any page requests')
+    parser.add_argument('--no-bundle', action='store_true',
+                        help='skip the minified, content-hashed venues bundle')
+    parser.add_argument('--binary-bundle', action='store_true',
+                        help='also write the columnar binary venues bundle')
+    parser.add_argument('--force', action='store_true',
+                        help='save even if validation fails (min counts, bounds, dropped teams)')
+    parser.add_argument('--rollback', action='store_true',
+                        help='restore the previous generation of each output file and exit')
+    parser.add_argument('--geocoders', default=None,
+                        help='comma-separated backend order from nominatim, gazetteer, mock '
+                             f"(default: {','.join(DEFAULT_GEOCODERS)}). "
+                             'With --offline, nominatim only answers from the geocode cache')
+    parser.add_argument('--mock-geocoder-url', default=DEFAULT_MOCK_URL,
+                        help='search endpoint used by the mock backend')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='parse and normalize list pages in this many worker processes '
+                             '(0 = in-process); geocoding stays in one rate-limited dispatcher')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH,
+                        help='journal of geocoded rows, deleted once the run is saved')
+    parser.add_argument('--resume', action='store_true',
+                        help='reuse the rows journaled by an interrupted run instead of geocoding them again')
+    parser.add_argument('--boundaries', default=DEFAULT_BOUNDARIES_PATH,
+                        help='GeoJSON of state/time-zone polygons used to add timezone, state and region')
+    parser.add_argument('--metrics-json', help='write per-stage timings and counters to this JSON file')
+    parser.add_argument('--metrics-prom',
+                        help='write the same metrics in Prometheus text format (e.g. for a textfile collector)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging(log_file=SCRAPER_LOG)
+    if args.rollback:
+        filenames = sorted({LEAGUES[league]['output'] for league in args.leagues})
+        ok = all([rollback_stadium_data(os.path.join(args.output_dir, f), args.backup_dir)
+                  for f in filenames])
+        raise SystemExit(0 if ok else 1)
+
+    # Always loaded: leagues outside --leagues are carried into the shared files and bundle
+    existing = load_existing_data(args.data_dir)
+    previous = existing if args.incremental else None
+    page_cache = PageCache(args.page_cache_dir, offline=args.offline)
+    checkpoint = Checkpoint(args.checkpoint, resume=args.resume)
+    scraper = LeagueScraper(args.leagues, previous=previous, max_age_days=args.max_age_days,
+                            page_cache=page_cache, checkpoint=checkpoint,
+                            parse_workers=args.parse_workers)
+    geocoders = args.geocoders.split(',') if args.geocoders else DEFAULT_GEOCODERS
+    # Offline, Nominatim only answers from the geocode cache
+    scraper.geocoder = build_chain(geocoders, scraper.session, scraper.cache,
+                                   offline=args.offline, mock_url=args.mock_geocoder_url)
+    stadiums = scraper.scrape_stadium_coordinates()
+    # Leagues not scraped this run, or optional ones whose page failed (left empty by the
+    # scraper), keep their existing records so the shared files and the bundle cover every league
+    for league, records in existing.items():
+        if not stadiums.get(league):
+            if league in scraper.leagues:
+                logging.warning(f"{league.upper()}: nothing scraped; keeping {len(records)} existing records")
+            stadiums[league] = records
+    # venue_ids are kept stable against the committed data even outside --incremental
+    with METRICS.span('dedupe'):
+        venue_stats = annotate_venues(stadiums, existing)
+    METRICS.incr('venues', venue_stats['venues'])
+    METRICS.incr('shared_venues', venue_stats['shared'])
+    # After dedupe, so every member of a shared venue gets the same answer
+    with METRICS.span('regions'):
+        enrich_stadiums(stadiums, BoundaryIndex.load(args.boundaries), existing)
+    promoted = [save_stadium_data(dataset, os.path.join(args.output_dir, filename), force=args.force,
+                                  backup_dir=args.backup_dir)
+                for filename, dataset in split_by_output(stadiums).items()]
+    if all(promoted):
+        checkpoint.discard()
+    else:
+        checkpoint.close()
+        logging.info(f"Checkpoint kept at {args.checkpoint}; rerun with --resume to reuse it")
+    if all(promoted) and not args.no_bundle:
+        with METRICS.span('bundle'):
+            manifest = write_bundles(stadiums, args.output_dir, binary=args.binary_bundle)
+        logging.info(f"Venue bundle written: {manifest}")
+    scraper.cache.log_stats()
+    scraper.geocoder.log_stats()
+    if args.incremental:
+        scraper.log_change_report()
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump({league: {status: sorted(names) for status, names in report.items()}
+                           for league, report in scraper.report.items()}, f, indent=4)
+    for league in scraper.leagues:
+        logging.info(f"Total {league.upper()} stadiums collected: {len(stadiums[league])}")
+    METRICS.log_summary()
+    METRICS.write(args.metrics_json, args.metrics_prom)
+    if not all(promoted):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# leagues.py
+
+"""
+Declarative per-league scrape specs consumed by LeagueScraper.
+
+Each entry describes:
+  url             Wikipedia list page
+  output          JSON file the league is written to
+  table_match     header names that must all appear in the target wikitable
+                  (None = use the first wikitable on the page)
+  columns         field -> (header name, fallback cell index); either
+                  'location' or 'city' + 'state'. The header is matched by
+                  case-insensitive prefix, so 'Team' also finds 'Team(s)'.
+  min_cells       rows with fewer cells are skipped
+  clean           run text_normalize.clean_text over stadium/team/location
+  strip_cells     strip each text fragment before joining (BeautifulSoup's
+                  get_text(strip=True)) instead of stripping the whole cell
+  location_fixes  listed location or its city part -> replacement location;
+                  matched on text_normalize.fold_key, so case, accents and
+                  punctuation don't matter
+  fallback_to_location  retry geocoding with just the location on a miss
+  required        abort the run if the page or table can't be scraped
+  min_count       fewer stadiums than this blocks saving the output file
+
+Adding a league (NBA, NHL, WNBA, ...) means adding an entry here.
+"""
+
+NCAA_LOCATION_FIXES = {
+    "Mississippi State": "Starkville, MS",
+    "Notre Dame": "Notre Dame, IN",
+    "University": "Oxford, MS",  # For Ole Miss
+    "College Township": "State College, PA",  # For Penn State
+    "USAF Academy": "Colorado Springs, CO",
+    "College Park": "College Park, MD",
+    "College Station": "College Station, TX",
+    "Paradise": "Las Vegas, NV"  # For Allegiant Stadium
+}
+
+LEAGUES = {
+    'nfl': {
+        'url': "https://en.wikipedia.org/wiki/List_of_current_National_Football_League_stadiums",
+        'output': 'stadium_coordinates.json',
+        'table_match': ['Stadium'],
+        'columns': {'stadium': ('Name', 1), 'team': ('Team', 2), 'location': ('Location', 3)},
+        'min_cells': 4,
+        'clean': False,
+        'strip_cells': False,
+        'location_fixes': {},
+        'fallback_to_location': False,
+        'required': True,
+        'min_count': 28,
+    },
+    'ncaa': {
+        'url': "https://en.wikipedia.org/wiki/List_of_NCAA_Division_I_FBS_football_stadiums",
+        'output': 'stadium_coordinates.json',
+        'table_match': None,
+        'columns': {'stadium': ('Stadium', 1), 'city': ('City', 2), 'state': ('State', 3), 'team': ('Team', 4)},
+        'min_cells': 5,
+        'clean': True,
+        'strip_cells': False,
+        'location_fixes': NCAA_LOCATION_FIXES,
+        'fallback_to_location': True,
+        'required': True,
+        'min_count': 120,
+    },
+    'mlb': {
+        'url': "https://en.wikipedia.org/wiki/List_of_current_Major_League_Baseball_stadiums",
+        'output': 'more_stadium_coordinates.json',
+        'table_match': ['Name', 'Team'],
+        'columns': {'stadium': ('Name', 1), 'location': ('Location', 3), 'team': ('Team', 5)},
+        'min_cells': 6,
+        'clean': True,
+        'strip_cells': True,
+        'location_fixes': {},
+        'fallback_to_location': True,
+        'required': True,
+        'min_count': 28,
+    },
+    'mls': {
+        'url': "https://en.wikipedia.org/wiki/List_of_Major_League_Soccer_stadiums",
+        'output': 'more_stadium_coordinates.json',
+        'table_match': ['Stadium', 'Team', 'Location'],
+        'columns': {'stadium': ('Stadium', 1), 'team': ('Team', 2), 'location': ('Location', 3)},
+        'min_cells': 4,
+        'clean': True,
+        'strip_cells': True,
+        'location_fixes': {},
+        'fallback_to_location': True,
+        'required': False,
+        'min_count': 25,
+    },
+}
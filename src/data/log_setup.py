@@ -0,0 +1,27 @@
+# log_setup.py
+
+"""
+Logging configuration for entry points. Modules only emit records; the
+command being run decides where they go, so importing a module never opens
+a log file or reconfigures the caller's logging.
+"""
+
+import logging
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+SCRAPER_LOG = 'league_scraper.log'
+
+def configure_logging(level: int = logging.INFO, log_file: Optional[str] = None) -> None:
+    """
+    Log to stderr, and to log_file if given. Does nothing when the root
+    logger already has handlers, so a main() called from another command
+    keeps that command's setup.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.insert(0, logging.FileHandler(log_file))
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers)
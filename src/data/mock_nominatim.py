@@ -0,0 +1,121 @@
+# mock_nominatim.py
+
+"""
+Local stub of Nominatim's /search endpoint for offline runs and tests.
+
+Serves recorded responses from a JSON file mapping query strings to the
+raw Nominatim result lists. Lookups use GeocodeCache.normalize on the query
+with the ", United States" suffix removed, so recordings keyed on the
+scraper's own queries match. Unknown queries return [] like the real API.
+Any other path can be served from a dict of static pages (used by
+bench_scraper.py to replay list-page HTML). /forecast answers like
+OpenWeatherMap's 5-day/3-hour endpoint with a synthetic series derived from
+lat/lon, for the forecast fetchers and weather_service.py.
+
+  python mock_nominatim.py --fixtures nominatim_fixtures.json --port 8089
+"""
+
+import argparse
+import json
+import logging
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from geocode_cache import GeocodeCache
+
+SUFFIX = ' united states'
+
+def _key(query: str) -> str:
+    key = GeocodeCache.normalize(query)
+    return key[:-len(SUFFIX)] if key.endswith(SUFFIX) else key
+
+FORECAST_STEP = 3 * 3600
+FORECAST_SLOTS = 40
+
+def synthetic_forecast(lat: float, lon: float, start: Optional[int] = None) -> Dict:
+    """Deterministic 5-day/3-hour forecast for (lat, lon), shaped like OpenWeatherMap's."""
+    if start is None:
+        start = int(time.time()) // FORECAST_STEP * FORECAST_STEP
+    slots = []
+    for i in range(FORECAST_SLOTS):
+        dt = start + i * FORECAST_STEP
+        hour = (dt // 3600) % 24
+        temp = round(90 - abs(lat) + (8 if 15 <= hour <= 23 else -4) + (i % 5), 1)
+        slots.append({
+            'dt': dt,
+            'main': {'temp': temp, 'feels_like': temp, 'humidity': 40 + (i * 7) % 50},
+            'weather': [{'id': 800, 'main': 'Clear', 'description': 'clear sky', 'icon': '01d'}],
+            'wind': {'speed': round(3 + abs(lon) % 7, 1), 'deg': (i * 45) % 360},
+            'pop': 0,
+        })
+    return {'cod': '200', 'cnt': len(slots), 'list': slots,
+            'city': {'coord': {'lat': lat, 'lon': lon}}}
+
+def make_server(fixtures: Dict[str, List[Dict]], host: str = '127.0.0.1', port: int = 8089,
+                pages: Optional[Dict[str, str]] = None,
+                forecast_delay: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Build (but don't start) the stub server. port=0 picks a free port.
+    forecast_delay adds latency to /forecast to stand in for the real API.
+    """
+    responses = {_key(query): result for query, result in fixtures.items()}
+    pages = pages or {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path in pages:
+                self.server.page_requests += 1
+                self._send(pages[url.path].encode('utf-8'), 'text/html; charset=utf-8')
+                return
+            if url.path == '/forecast':
+                params = parse_qs(url.query)
+                self.server.forecast_requests += 1
+                if forecast_delay:
+                    time.sleep(forecast_delay)
+                forecast = synthetic_forecast(float(params['lat'][0]), float(params['lon'][0]))
+                self._send(json.dumps(forecast).encode('utf-8'), 'application/json')
+                return
+            if url.path != '/search':
+                self.send_error(404)
+                return
+            query = parse_qs(url.query).get('q', [''])[0]
+            self.server.request_count += 1
+            self._send(json.dumps(responses.get(_key(query), [])).encode('utf-8'), 'application/json')
+
+        def _send(self, body: bytes, content_type: str):
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logging.debug(format % args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.request_count = 0
+    server.page_requests = 0
+    server.forecast_requests = 0
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve recorded Nominatim responses locally.')
+    parser.add_argument('--fixtures', required=True, help='JSON file of {query: [results]}')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--forecast-delay', type=float, default=0.0, help='seconds added to each /forecast')
+    args = parser.parse_args(argv)
+    with open(args.fixtures, encoding='utf-8') as f:
+        fixtures = json.load(f)
+    server = make_server(fixtures, args.host, args.port, forecast_delay=args.forecast_delay)
+    print(f"Mock Nominatim serving {len(fixtures)} queries on http://{args.host}:{args.port}/search")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
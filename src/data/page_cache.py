@@ -0,0 +1,92 @@
+# page_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from resilience import TransientError, request_with_retry
+from run_metrics import METRICS
+
+DEFAULT_PAGE_CACHE_DIR = 'page_cache'
+
+class PageCache:
+    """
+    On-disk cache of raw list-page HTML plus its ETag / Last-Modified headers.
+    fetch() issues a conditional GET and reports whether the page changed;
+    in offline mode it replays the cached copy without touching the network.
+    """
+
+    def __init__(self, directory: str = DEFAULT_PAGE_CACHE_DIR, offline: bool = False):
+        self.directory = directory
+        self.offline = offline
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + '.html', base + '.json'
+
+    def load(self, url: str) -> Tuple[Optional[str], Dict]:
+        html_path, meta_path = self._paths(url)
+        if not (os.path.exists(html_path) and os.path.exists(meta_path)):
+            return None, {}
+        with open(html_path, encoding='utf-8') as f:
+            html = f.read()
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        return html, meta
+
+    def store(self, url: str, html: str, headers) -> None:
+        html_path, meta_path = self._paths(url)
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched': time.time()
+        }
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=4)
+
+    def fetch(self, session, url: str, timeout: float = 10) -> Tuple[str, bool]:
+        """
+        Return (html, changed). changed is False when the server answered
+        304 Not Modified (or in offline mode), meaning the cached copy is current.
+        If the server is still throttling or down after retries, a cached copy
+        is served instead (also with changed=False).
+        """
+        html, meta = self.load(url)
+        if self.offline:
+            METRICS.incr('page_cache', result='hit' if html is not None else 'miss')
+            if html is None:
+                raise FileNotFoundError(f"Offline mode: no cached copy of {url}")
+            logging.info(f"Offline mode: replaying cached {url}")
+            return html, False
+
+        headers = {}
+        if html is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            response = request_with_retry(session, url, 'page', headers=headers, timeout=timeout)
+        except TransientError as e:
+            if html is None:
+                raise
+            logging.warning(f"{e}; using the cached copy from {time.ctime(meta.get('fetched', 0))}")
+            METRICS.incr('page_cache', result='stale')
+            return html, False
+        if response.status_code == 304 and html is not None:
+            logging.info(f"Not modified since last fetch: {url}")
+            METRICS.incr('page_cache', result='hit')
+            return html, False
+        METRICS.incr('page_cache', result='miss')
+        response.raise_for_status()
+        self.store(url, response.text, response.headers)
+        return response.text, True
@@ -0,0 +1,49 @@
+# rate_limit.py
+
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() blocks until a token is available,
+    so callers that never reach the network (cache hits, skipped rows) never wait.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate  # tokens per second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+HOST_RATES = {
+    # Nominatim usage policy: absolute maximum of 1 request per second
+    'nominatim.openstreetmap.org': 1 / 1.1,
+    # OpenWeatherMap free tier: 60 calls per minute
+    'api.openweathermap.org': 1.0,
+}
+
+def limiter_for(url: str, default_rate: float = 5.0) -> TokenBucket:
+    """Return the shared limiter for the host of url, creating it on first use."""
+    host = urlparse(url).netloc
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = TokenBucket(HOST_RATES.get(host, default_rate))
+        return _limiters[host]
@@ -0,0 +1,165 @@
+# resilience.py
+
+"""
+Retry with exponential backoff and a per-host circuit breaker, shared by
+the page fetcher, the geocoders and the forecast fetcher.
+
+request_with_retry() retries 429/5xx responses and connection errors. A
+Retry-After header pauses every caller of that host (through its breaker),
+not just the thread that got it; otherwise the caller backs off 1s, 2s,
+4s... with jitter. After failure_threshold consecutive failures the breaker
+opens and holds all requests to the host for reset_timeout seconds, then
+lets a single probe through before reopening the queue. When attempts run
+out, TransientError is raised so callers can set the work aside (the
+scraper's dead-letter pass) instead of recording it as a miss.
+"""
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from run_metrics import METRICS
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+class TransientError(Exception):
+    """The upstream is throttling or unavailable; the request may succeed later."""
+
+def retry_after_seconds(response) -> Optional[float]:
+    """Parse a Retry-After header given as delta-seconds or an HTTP date."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+class CircuitBreaker:
+    """
+    Thread-safe breaker for one upstream host. wait() blocks while the
+    circuit is open; once the timeout passes, one caller probes the host and
+    the rest wait for its outcome.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.cond = threading.Condition()
+
+    def wait(self) -> None:
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                if now < self.open_until:
+                    self.cond.wait(self.open_until - now)
+                elif self.failures >= self.failure_threshold:
+                    if not self.probing:
+                        self.probing = True  # half-open: this caller is the probe
+                        return
+                    self.cond.wait(self.reset_timeout)
+                else:
+                    return
+
+    def record_success(self) -> None:
+        with self.cond:
+            if self.failures >= self.failure_threshold:
+                logging.info(f"Circuit for {self.name} closed")
+            self.failures = 0
+            self.probing = False
+            self.cond.notify_all()
+
+    def release(self) -> None:
+        """Give up a probe without an outcome (e.g. the caller was interrupted)."""
+        with self.cond:
+            self.probing = False
+            self.cond.notify_all()
+
+    def record_failure(self, pause: Optional[float] = None) -> None:
+        """Count a failure; pause (from Retry-After) holds every caller for that long."""
+        with self.cond:
+            self.failures += 1
+            self.probing = False
+            now = time.monotonic()
+            if pause:
+                self.open_until = max(self.open_until, now + pause)
+            if self.failures >= self.failure_threshold:
+                if self.failures == self.failure_threshold:
+                    logging.warning(f"Circuit for {self.name} open after {self.failures} failures; "
+                                    f"pausing requests for {self.reset_timeout:.0f}s")
+                    METRICS.incr('circuit_opened', host=self.name)
+                self.open_until = max(self.open_until, now + self.reset_timeout)
+            self.cond.notify_all()
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def breaker_for(url: str) -> CircuitBreaker:
+    """Return the shared breaker for the host of url, creating it on first use."""
+    host = urlparse(url).netloc
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+def request_with_retry(session, url: str, target: str, limiter=None,
+                       breaker: Optional[CircuitBreaker] = None,
+                       max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                       backoff: float = DEFAULT_BACKOFF, **kwargs):
+    """
+    GET url through the host's breaker and (optional) rate limiter. Returns
+    the first response that isn't a retryable status; non-retryable errors
+    such as 404 are left for the caller's raise_for_status(). Raises
+    TransientError once max_attempts are used up.
+    """
+    import requests  # deferred so importing this module doesn't load requests
+    breaker = breaker if breaker is not None else breaker_for(url)
+    reason = None
+    for attempt in range(max_attempts):
+        if attempt:
+            METRICS.incr('retries', target=target, reason=reason)
+        breaker.wait()
+        if limiter is not None:
+            limiter.acquire()
+        pause = None
+        try:
+            with METRICS.span('http_request', target=target):
+                response = session.get(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            reason = type(e).__name__
+        except Exception:
+            # Not retryable (TooManyRedirects, InvalidURL...), but the breaker must still hear
+            # about it: if this was the half-open probe, every other caller is waiting on it
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            METRICS.incr('http_responses', target=target, status_class=f"{response.status_code // 100}xx")
+            if response.status_code not in RETRY_STATUSES:
+                breaker.record_success()
+                return response
+            reason = str(response.status_code)
+            pause = retry_after_seconds(response)
+        breaker.record_failure(pause)
+        if attempt + 1 < max_attempts and pause is None:
+            delay = min(MAX_BACKOFF, backoff * 2 ** attempt)
+            time.sleep(delay * random.uniform(0.5, 1.0))
+    raise TransientError(f"{url} still failing after {max_attempts} attempts ({reason})")
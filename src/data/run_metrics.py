@@ -0,0 +1,160 @@
+# run_metrics.py
+
+"""
+Structured per-stage timings and counters for scraper runs.
+
+Stages are timed with METRICS.span('geocode', league='nfl'); events are
+counted with METRICS.incr('http_responses', target='page', status_class='5xx').
+At the end of a run the totals can be logged as one summary, dumped as JSON
+or rendered in the Prometheus text exposition format (for a node_exporter
+textfile collector or a Pushgateway).
+
+Like the rate limiters, METRICS is one shared, thread-safe registry per
+process; call reset() between runs in the same process.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+PROMETHEUS_PREFIX = 'svw_scraper'
+# HELP text of the fixed series; long-running processes pass their own to to_prometheus()
+SCRAPER_HELP = {
+    'run_duration_seconds': 'Wall time of the scraper run.',
+    'run_start_timestamp_seconds': 'Unix time the run started.',
+    'stage_calls_total': 'Calls per pipeline stage.',
+    'stage_seconds_total': 'Total seconds spent per pipeline stage.',
+    'stage_seconds_max': 'Longest single call per pipeline stage.',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_INVALID_METRIC_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+
+def _labels(labels: Dict) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+class RunMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.started = time.time()
+            self.started_monotonic = time.perf_counter()
+            self.counters: Dict[Tuple[str, Labels], float] = {}
+            # (stage, labels) -> [calls, total seconds, max seconds]
+            self.spans: Dict[Tuple[str, Labels], List[float]] = {}
+
+    def incr(self, name: str, amount: float = 1, **labels) -> None:
+        key = (name, _labels(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, stage: str, seconds: float, **labels) -> None:
+        key = (stage, _labels(labels))
+        with self.lock:
+            span = self.spans.setdefault(key, [0, 0.0, 0.0])
+            span[0] += 1
+            span[1] += seconds
+            span[2] = max(span[2], seconds)
+
+    @contextmanager
+    def span(self, stage: str, **labels) -> Iterator[None]:
+        """Time the enclosed block as one call of stage (recorded even if it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def summary(self) -> Dict:
+        with self.lock:
+            stages = [{'stage': stage, 'labels': dict(labels), 'calls': int(calls),
+                       'total_seconds': round(total, 6), 'max_seconds': round(longest, 6)}
+                      for (stage, labels), (calls, total, longest) in sorted(self.spans.items())]
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            duration = time.perf_counter() - self.started_monotonic
+        return {
+            'started': self.started,
+            'duration_seconds': round(duration, 6),
+            'stages': stages,
+            'counters': counters
+        }
+
+    def to_prometheus(self, prefix: str = PROMETHEUS_PREFIX, help_text: Optional[Dict[str, str]] = None) -> str:
+        help_text = dict(SCRAPER_HELP, **(help_text or {}))
+        summary = self.summary()
+        lines = [
+            f"# HELP {prefix}_run_duration_seconds {help_text['run_duration_seconds']}",
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"{prefix}_run_duration_seconds {summary['duration_seconds']}",
+            f"# HELP {prefix}_run_start_timestamp_seconds {help_text['run_start_timestamp_seconds']}",
+            f"# TYPE {prefix}_run_start_timestamp_seconds gauge",
+            f"{prefix}_run_start_timestamp_seconds {summary['started']:.3f}",
+        ]
+        stage_series = [
+            ('stage_calls_total', 'counter', 'calls'),
+            ('stage_seconds_total', 'counter', 'total_seconds'),
+            ('stage_seconds_max', 'gauge', 'max_seconds'),
+        ]
+        for metric, kind, field in stage_series:
+            lines.append(f"# HELP {prefix}_{metric} {help_text[metric]}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for entry in summary['stages']:
+                labels = _labels(dict(entry['labels'], stage=entry['stage']))
+                lines.append(f"{prefix}_{metric}{_format_labels(labels)} {entry[field]}")
+
+        seen = set()
+        for entry in summary['counters']:
+            metric = f"{prefix}_{_INVALID_METRIC_CHARS.sub('_', entry['name'])}_total"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(_labels(entry['labels']))} {entry['value']:g}")
+        return '\n'.join(lines) + '\n'
+
+    def log_summary(self) -> None:
+        summary = self.summary()
+        totals: Dict[str, List[float]] = {}
+        for entry in summary['stages']:
+            stage = totals.setdefault(entry['stage'], [0, 0.0])
+            stage[0] += entry['calls']
+            stage[1] += entry['total_seconds']
+        stages = ', '.join(f"{stage}={seconds:.2f}s/{calls}"
+                           for stage, (calls, seconds) in totals.items())
+        logging.info(f"Run finished in {summary['duration_seconds']:.2f}s; stages (time/calls): {stages}")
+        counters: Dict[str, float] = {}
+        for entry in summary['counters']:
+            labels = ','.join(f"{k}={v}" for k, v in sorted(entry['labels'].items()))
+            counters[f"{entry['name']}[{labels}]" if labels else entry['name']] = entry['value']
+        if counters:
+            logging.info('Counters: ' + ', '.join(f"{k}={v:g}" for k, v in counters.items()))
+
+    def write(self, json_path: Optional[str] = None, prometheus_path: Optional[str] = None) -> None:
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(self.summary(), f, indent=4)
+        if prometheus_path:
+            # Write-then-rename so a textfile collector never scrapes a partial file
+            tmp_path = prometheus_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, prometheus_path)
+
+METRICS = RunMetrics()
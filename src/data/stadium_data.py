@@ -0,0 +1,204 @@
+# stadium_data.py
+
+"""
+Lightweight access to the generated coordinate files: loading, validation
+and atomic saving. Imports nothing heavier than the standard library, so
+consumers of the data don't pull in the scraper's HTTP stack.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import shutil
+import stat
+import tempfile
+from typing import Dict, List, Optional
+
+from leagues import LEAGUES
+from run_metrics import METRICS
+from text_normalize import fold_key
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'public', 'data')
+# Rollback copies; kept out of public/, which is deployed as-is
+DEFAULT_BACKUP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_backups')
+# Read once: os.umask can only be queried by setting it, which isn't thread-safe
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def load_existing_data(data_dir: str = DEFAULT_DATA_DIR) -> Dict:
+    """Merge every league from the existing output files in data_dir into one dict."""
+    existing = {}
+    for filename in sorted({spec['output'] for spec in LEAGUES.values()}):
+        path = os.path.join(data_dir, filename)
+        if not os.path.exists(path):
+            logging.warning(f"No existing data at {path}")
+            continue
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        for league, records in data.items():
+            if league in LEAGUES:
+                existing[league] = records
+    return existing
+
+# Continental US, Alaska, and Hawaii bounds
+US_BOUNDS = {
+    'continental': {'lat': (24.7, 49.4), 'lon': (-125.0, -66.9)},
+    'alaska': {'lat': (51.0, 71.5), 'lon': (-180.0, -130.0)},
+    'hawaii': {'lat': (18.7, 22.5), 'lon': (-160.3, -154.5)},
+}
+
+def validate_us_coordinates(lat: float, lon: float) -> bool:
+    """Check if lat/lon is in the continental US, Alaska, or Hawaii bounds."""
+    return any(region['lat'][0] <= lat <= region['lat'][1] and
+               region['lon'][0] <= lon <= region['lon'][1]
+               for region in US_BOUNDS.values())
+
+EARTH_RADIUS_KM = 6371.0088
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points (scalar; see venue_index for arrays)."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+def validate_dataset(dataset: Dict, previous: Optional[Dict] = None) -> List[str]:
+    """
+    Return a list of problems that should block promoting dataset to
+    production: leagues below their minimum count, out-of-bounds coordinates,
+    and leagues or teams present in the previous version but missing now.
+    """
+    errors = []
+    # A league missing outright would otherwise never reach the per-league checks below
+    for league, records in (previous or {}).items():
+        if league in LEAGUES and records and not dataset.get(league):
+            errors.append(f"{league}: dropped vs. previous version ({len(records)} stadiums)")
+    for league, records in dataset.items():
+        if league not in LEAGUES:
+            continue
+        min_count = LEAGUES[league].get('min_count', 1)
+        if len(records) < min_count:
+            errors.append(f"{league}: {len(records)} stadiums, expected at least {min_count}")
+        for name, record in records.items():
+            try:
+                lat, lon = float(record['latitude']), float(record['longitude'])
+            except (KeyError, TypeError, ValueError):
+                errors.append(f"{league}: {name} has no usable coordinates")
+                continue
+            if not validate_us_coordinates(lat, lon):
+                METRICS.incr('invalid_bounds', stage='validate')
+                errors.append(f"{league}: {name} out of US bounds ({lat}, {lon})")
+        if previous and previous.get(league):
+            # Compared on fold_key so a cleaning change ("Texas A M" -> "Texas A&M") isn't a drop
+            teams = {fold_key(r.get('team', '')) for r in records.values()}
+            dropped = sorted({r.get('team', '') for r in previous[league].values()
+                              if fold_key(r.get('team', '')) not in teams})
+            if dropped:
+                errors.append(f"{league}: teams dropped vs. previous version: {', '.join(dropped)}")
+    return errors
+
+def previous_generation(filename: str, backup_dir: Optional[str] = None) -> str:
+    """
+    Where the generation filename replaced is kept. By default that is a
+    subdirectory of DEFAULT_BACKUP_DIR named for filename's directory, so a
+    save into a scratch directory never touches the deployed file's copy.
+    """
+    if backup_dir is None:
+        directory = os.path.dirname(os.path.realpath(filename))
+        digest = hashlib.sha1(directory.encode('utf-8')).hexdigest()[:10]
+        backup_dir = os.path.join(DEFAULT_BACKUP_DIR, f"{os.path.basename(directory)}-{digest}")
+    return os.path.join(backup_dir, os.path.basename(filename) + '.prev')
+
+def atomic_write_json(data: Dict, filename: str, indent: Optional[int] = 4,
+                      backup_dir: Optional[str] = None) -> None:
+    """
+    Write data to a temp file in the same directory, fsync it and rename it
+    over filename, so readers only ever see the old or the new file. The file
+    being replaced is kept for rollback (see previous_generation), and its
+    permissions carry over to the new one.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    # Same directory so the rename is atomic; the suffix keeps a crash leftover gitignored
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(filename) + '.', suffix='.tmp',
+                                    dir=directory)
+    try:
+        # mkstemp creates 0600; match what open() would have given, since public/ is served as-is
+        if os.path.exists(filename):
+            mode = stat.S_IMODE(os.stat(filename).st_mode)
+        else:
+            mode = 0o666 & ~_UMASK
+        if hasattr(os, 'fchmod'):
+            os.fchmod(fd, mode)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(filename):
+            prev = previous_generation(filename, backup_dir)
+            os.makedirs(os.path.dirname(prev), exist_ok=True)
+            shutil.copy2(filename, prev)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if hasattr(os, 'O_DIRECTORY'):
+        # Persist the rename itself
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def save_stadium_data(stadiums: Dict, filename: str, force: bool = False,
+                      backup_dir: Optional[str] = None) -> bool:
+    """
+    Validate stadiums against the file it replaces and atomically promote it.
+    Returns False (leaving the existing file untouched) if validation fails,
+    unless force is set. backup_dir overrides where the replaced file is kept.
+    """
+    previous = None
+    if os.path.exists(filename):
+        try:
+            with open(filename, encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read current {filename} for comparison: {e}")
+
+    output = os.path.basename(filename)
+    with METRICS.span('validate', output=output):
+        errors = validate_dataset(stadiums, previous)
+    METRICS.incr('validation_errors', len(errors), output=output)
+    if errors:
+        for error in errors:
+            logging.error(f"Validation failed for {filename}: {error}")
+        if not force:
+            logging.error(f"Not promoting {filename}; existing file left in place")
+            METRICS.incr('saves', output=output, result='rejected')
+            return False
+        logging.warning(f"Promoting {filename} despite {len(errors)} validation errors (forced)")
+
+    try:
+        with METRICS.span('save', output=output):
+            atomic_write_json(stadiums, filename, backup_dir=backup_dir)
+        logging.info(f"Stadium data saved to {filename}")
+        METRICS.incr('saves', output=output, result='promoted')
+        return True
+    except Exception as e:
+        logging.error(f"Error saving stadium data: {e}")
+        METRICS.incr('saves', output=output, result='error')
+        return False
+
+def rollback_stadium_data(filename: str, backup_dir: Optional[str] = None) -> bool:
+    """Restore the previous generation of filename, keeping the rolled-back file as the new one."""
+    prev = previous_generation(filename, backup_dir)
+    if not os.path.exists(prev):
+        logging.error(f"No previous generation to roll back to for {filename}")
+        return False
+    with open(prev, encoding='utf-8') as f:
+        data = json.load(f)
+    atomic_write_json(data, filename, backup_dir=backup_dir)
+    logging.info(f"Rolled {filename} back to its previous generation")
+    return True
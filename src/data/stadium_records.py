@@ -0,0 +1,186 @@
+# stadium_records.py
+
+"""
+Compact, read-only view of the coordinate files for long-lived consumers
+(weather_service.py workers, the forecast and kickoff batch jobs).
+
+load_stadiums() returns the same {league: {stadium: record}} shape as
+stadium_data.load_existing_data(), but each record is a Stadium with
+__slots__ instead of a dict:
+
+  - the per-record key strings and dict overhead go away;
+  - league, team, location, state, timezone and region strings are
+    interned, so a team or city repeated across records (and leagues) is
+    stored once;
+  - display_name, type, last_verified and tenants, which nothing reads on
+    a hot path, are dropped after parsing and re-read from the file the
+    first time a record asks for one.
+
+Stadium also answers record['latitude'] and record.get('team'), so code
+written against the dict records (group_venues, VenueIndex.from_data) takes
+either. The scrapers keep using dicts: they mutate and save records.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from leagues import LEAGUES
+from stadium_data import DEFAULT_DATA_DIR
+from text_normalize import parse_city_state
+
+RARE_FIELDS = ('display_name', 'type', 'last_verified', 'tenants')
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+@lru_cache(maxsize=4096)
+def _state_of(location: str) -> Optional[str]:
+    # Cached: locations repeat across records, and parsing one isn't free
+    parsed = parse_city_state(location) if location else None
+    return sys.intern(parsed[1]) if parsed else None
+
+class _RareFields:
+    """Rarely read fields of one coordinate file, parsed again on first use."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = os.stat(path).st_mtime_ns
+        self.records: Optional[Dict[Tuple[str, str], Dict]] = None
+        self.lock = threading.Lock()
+
+    def record(self, league: str, name: str) -> Dict:
+        with self.lock:
+            if self.records is None:
+                if os.stat(self.path).st_mtime_ns != self.mtime:
+                    logging.warning(f"{self.path} changed since it was loaded; rare fields may not match")
+                with open(self.path, encoding='utf-8') as f:
+                    data = json.load(f)
+                self.records = {(league_name, stadium): {field: record[field] for field in RARE_FIELDS
+                                                         if field in record}
+                                for league_name, records in data.items() if league_name in LEAGUES
+                                for stadium, record in records.items()}
+        return self.records.get((league, name), {})
+
+class Stadium:
+    __slots__ = ('league', 'name', 'team', 'location', 'state', 'timezone', 'region',
+                 'latitude', 'longitude', 'venue_id', 'confidence', '_rare')
+
+    def __init__(self, league: str, name: str, team: str, location: str, latitude: float,
+                 longitude: float, venue_id: Optional[str] = None, confidence: Optional[float] = None,
+                 rare=None, state: Optional[str] = None, timezone: Optional[str] = None,
+                 region: Optional[str] = None):
+        self.league = _intern(league)
+        self.name = name
+        self.team = _intern(team)
+        self.location = _intern(location)
+        # Enriched records carry the state their coordinates fall in; older ones only the listed one
+        self.state = _intern(state) or _state_of(location)
+        self.timezone = _intern(timezone)
+        self.region = _intern(region)
+        self.latitude = latitude
+        self.longitude = longitude
+        self.venue_id = venue_id
+        self.confidence = confidence
+        # Either the record's rare fields or the _RareFields to fetch them from
+        self._rare = rare if rare is not None else {}
+
+    @classmethod
+    def from_record(cls, league: str, name: str, record: Dict, rare=None) -> 'Stadium':
+        """Build from a coordinate-file record; rare fields are kept inline unless rare is given."""
+        if rare is None:
+            rare = {field: record[field] for field in RARE_FIELDS if field in record}
+        return cls(league, name, record.get('team', ''), record.get('location', ''),
+                   float(record['latitude']), float(record['longitude']),
+                   record.get('venue_id'), record.get('confidence'), rare,
+                   record.get('state'), record.get('timezone'), record.get('region'))
+
+    def _rare_field(self, field: str):
+        rare = self._rare
+        if isinstance(rare, _RareFields):
+            rare = self._rare = rare.record(self.league, self.name)
+        return rare.get(field)
+
+    @property
+    def display_name(self) -> Optional[str]:
+        return self._rare_field('display_name')
+
+    @property
+    def venue_type(self) -> Optional[str]:
+        return self._rare_field('type')
+
+    @property
+    def last_verified(self) -> Optional[str]:
+        return self._rare_field('last_verified')
+
+    @property
+    def tenants(self):
+        return self._rare_field('tenants')
+
+    # Dict-style access, for code written against the plain records
+
+    def __getitem__(self, key: str):
+        if key in RARE_FIELDS:
+            value = self._rare_field(key)
+        elif key in _RECORD_FIELDS:
+            value = getattr(self, key)
+        else:
+            value = None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict:
+        """The record as the coordinate files store it."""
+        record = {'location': self.location, 'team': self.team,
+                  'latitude': self.latitude, 'longitude': self.longitude}
+        for field in ('venue_id', 'confidence') + RARE_FIELDS + ('timezone', 'state', 'region'):
+            value = self.get(field)
+            if value is not None:
+                record[field] = value
+        if not self.timezone:
+            # Not enriched: state was parsed from location, not read from the file
+            record.pop('state', None)
+        return record
+
+    def __repr__(self) -> str:
+        return (f"Stadium({self.league!r}, {self.name!r}, team={self.team!r}, "
+                f"lat={self.latitude}, lon={self.longitude})")
+
+# Record keys answered straight from slots
+_RECORD_FIELDS = frozenset(('team', 'location', 'latitude', 'longitude', 'venue_id', 'confidence',
+                            'state', 'timezone', 'region'))
+
+def load_stadium_file(path: str, lazy: bool = True) -> Dict[str, Dict[str, Stadium]]:
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    rare = _RareFields(path) if lazy else None
+    return {league: {name: Stadium.from_record(league, name, record, rare) for name, record in records.items()}
+            for league, records in data.items() if league in LEAGUES}
+
+def load_stadiums(data_dir: str = DEFAULT_DATA_DIR, lazy: bool = True) -> Dict[str, Dict[str, Stadium]]:
+    """
+    Every league from the coordinate files in data_dir as Stadium records.
+    lazy=False keeps the rare fields in memory instead of re-reading them.
+    """
+    stadiums = {}
+    for filename in sorted({spec['output'] for spec in LEAGUES.values()}):
+        path = os.path.join(data_dir, filename)
+        if not os.path.exists(path):
+            logging.warning(f"No existing data at {path}")
+            continue
+        stadiums.update(load_stadium_file(path, lazy))
+    return stadiums
@@ -0,0 +1,153 @@
+# table_extract.py
+
+"""
+Streaming wikitable extractor.
+
+Builds no document tree: a single HTMLParser pass keeps only the text of
+cells inside <table class="wikitable"> elements, so memory is proportional
+to the table text rather than the whole page. Each row comes out as a plain
+tuple of cell strings.
+"""
+
+from html.parser import HTMLParser
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+Row = Tuple[str, ...]
+
+class Wikitable:
+    __slots__ = ('headers', 'rows')
+
+    def __init__(self):
+        self.headers: Row = ()
+        self.rows: List[Row] = []  # body rows, header row excluded
+
+    def text(self) -> str:
+        return ' '.join(' '.join(row) for row in ((self.headers,) + tuple(self.rows)))
+
+class _WikitableParser(HTMLParser):
+    def __init__(self, strip_cells: bool):
+        super().__init__(convert_charrefs=True)
+        self.strip_cells = strip_cells
+        self.tables: List[Wikitable] = []
+        self.depth = 0  # <table> nesting depth inside the current wikitable
+        self.current: Optional[Wikitable] = None
+        self.row: Optional[List[str]] = None
+        self.cell: Optional[List[str]] = None
+        self.seen_header = False
+        self.skip = 0  # inside <style>/<script>, whose text get_text() ignores
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('style', 'script'):
+            self.skip += 1
+            return
+        if tag == 'table':
+            if self.current is not None:
+                self.depth += 1  # nested table text folds into the enclosing cell
+            elif 'wikitable' in (dict(attrs).get('class') or '').split():
+                self.current = Wikitable()
+                self.depth = 1
+                self.seen_header = False
+            return
+        if self.current is None or self.depth != 1:
+            return
+        if tag == 'tr':
+            self._end_row()
+            self.row = []
+        elif tag in ('td', 'th') and self.row is not None:
+            self._end_cell()
+            self.cell = []
+
+    def handle_endtag(self, tag):
+        if tag in ('style', 'script'):
+            self.skip = max(0, self.skip - 1)
+            return
+        if self.current is None:
+            return
+        if tag == 'table':
+            self.depth -= 1
+            if self.depth == 0:
+                self._end_row()
+                self.tables.append(self.current)
+                self.current = None
+        elif self.depth == 1:
+            if tag in ('td', 'th'):
+                self._end_cell()
+            elif tag == 'tr':
+                self._end_row()
+
+    def handle_data(self, data):
+        if self.cell is not None and not self.skip:
+            self.cell.append(data)
+
+    def _end_cell(self):
+        if self.cell is None:
+            return
+        if self.strip_cells:
+            # Same result as BeautifulSoup's get_text(strip=True)
+            text = ''.join(piece.strip() for piece in self.cell)
+        else:
+            text = ''.join(self.cell).strip()
+        self.row.append(text)
+        self.cell = None
+
+    def _end_row(self):
+        self._end_cell()
+        if self.row is None:
+            return
+        if not self.seen_header:
+            self.current.headers = tuple(self.row)
+            self.seen_header = True
+        else:
+            self.current.rows.append(tuple(self.row))
+        self.row = None
+
+def extract_wikitables(html: str, strip_cells: bool = False) -> List[Wikitable]:
+    parser = _WikitableParser(strip_cells)
+    parser.feed(html)
+    parser.close()
+    return parser.tables
+
+def _header_key(text: str) -> str:
+    return text.split('[')[0].strip().lower()
+
+def find_table(tables: Sequence[Wikitable], table_match: Optional[Sequence[str]]) -> Optional[Wikitable]:
+    """
+    Pick the first table whose header cells include every name in table_match,
+    falling back to one whose text contains them anywhere. None = first table.
+    """
+    if not table_match:
+        return tables[0] if tables else None
+    wanted = [m.lower() for m in table_match]
+    for t in tables:
+        headers = [_header_key(h) for h in t.headers]
+        if all(any(h.startswith(w) for h in headers) for w in wanted):
+            return t
+    for t in tables:
+        text = t.text()
+        if all(m in text for m in table_match):
+            return t
+    return None
+
+def resolve_columns(headers: Row, columns: Dict[str, Union[int, Tuple[str, int]]]) -> Dict[str, int]:
+    """
+    Map each field to a cell index. A column is either a fixed index or a
+    (header name, fallback index) pair matched case-insensitively by prefix.
+    """
+    keys = [_header_key(h) for h in headers]
+    resolved = {}
+    for field, column in columns.items():
+        if isinstance(column, int):
+            resolved[field] = column
+            continue
+        name, fallback = column
+        name = name.lower()
+        resolved[field] = next((i for i, k in enumerate(keys) if k.startswith(name)), fallback)
+    return resolved
+
+def iter_rows(table: Wikitable, columns: Dict[str, int], min_cells: int) -> Iterator[Optional[Dict[str, str]]]:
+    """Yield a {field: text} dict per body row, or None for rows with too few cells."""
+    for row in table.rows:
+        if len(row) < min_cells or any(i >= len(row) for i in columns.values()):
+            yield None
+        else:
+            yield {field: row[i] for field, i in columns.items()}
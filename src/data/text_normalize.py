@@ -0,0 +1,125 @@
+# text_normalize.py
+
+"""
+Shared normalization for scraped stadium, team and location text.
+
+  clean_text(text)      display form written to the coordinate files:
+                        footnote markers ([1], [f], [O 1]) removed, letters
+                        of any script (so accents survive) plus the
+                        punctuation names really use (. ' - &) kept, and
+                        everything else collapsed to single spaces.
+  fold_key(text)        comparison key: accents stripped, casefolded,
+                        periods dropped, other punctuation turned into
+                        spaces, saint/mount/fort shortened to st/mt/ft.
+                        "St. Louis", "Saint Louis" and "ST LOUIS" share a key.
+  location_key(text)    fold_key with a trailing state name or abbreviation
+                        canonicalized, so "St. Louis, Missouri" and
+                        "Saint Louis MO" match.
+  parse_city_state(text)  (city key, state abbreviation) or None.
+
+RowNormalizer applies one league spec (clean flag plus its indexed
+location_fixes) to a whole table of rows at once.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from us_states import STATE_ABBREVIATIONS, STATE_NAMES
+
+_FOOTNOTE = re.compile(r'\[[^\]]*\]')
+_DISALLOWED = re.compile(r"[^\w\s\-'.&]|_")
+_WHITESPACE = re.compile(r'\s+')
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+_WORD_ALIASES = {'saint': 'st', 'mount': 'mt', 'fort': 'ft'}
+
+_STATE_LOOKUP = {name.lower(): abbr for name, abbr in STATE_ABBREVIATIONS.items()}
+_STATE_LOOKUP.update({abbr.lower(): abbr for abbr in STATE_NAMES})
+_STATE_LOOKUP['d c'] = 'DC'  # "Washington D C" from older cleaned data
+_MAX_STATE_WORDS = max(len(k.split()) for k in _STATE_LOOKUP)
+
+_CACHE_SIZE = 8192  # Team names, cities and states repeat heavily across rows
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def clean_text(text: str) -> str:
+    text = _FOOTNOTE.sub('', unicodedata.normalize('NFC', text))
+    text = _DISALLOWED.sub(' ', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _fold_words(text: str) -> Tuple[str, ...]:
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).casefold().replace('.', '')
+    return tuple(_WORD_ALIASES.get(w, w) for w in _NON_WORD.sub(' ', text).split())
+
+def fold_key(text: str) -> str:
+    return ' '.join(_fold_words(text))
+
+def _split_state(words: Tuple[str, ...]) -> Optional[Tuple[str, str]]:
+    # Longest state names first so "west virginia" wins over "virginia"
+    for n in range(min(_MAX_STATE_WORDS, len(words) - 1), 0, -1):
+        abbr = _STATE_LOOKUP.get(' '.join(words[-n:]))
+        if abbr:
+            return ' '.join(words[:-n]), abbr
+    return None
+
+def parse_city_state(text: str) -> Optional[Tuple[str, str]]:
+    """
+    Split "City, State", "City State" or "City, ST" into a normalized
+    (city, ST) key, or return None if no trailing state is recognized.
+    """
+    return _split_state(_fold_words(text))
+
+def canonical_state(text: str) -> Optional[str]:
+    """Postal abbreviation for a state name or abbreviation, else None."""
+    return _STATE_LOOKUP.get(fold_key(text))
+
+def location_key(text: str) -> str:
+    words = _fold_words(text)
+    parsed = _split_state(words)
+    if parsed is None:
+        return ' '.join(words)
+    return f"{parsed[0]} {parsed[1].lower()}"
+
+class LocationAliases:
+    """
+    Indexed location fixes. A key matches a location whose whole text, or
+    whose city part (before a trailing state), folds to the same key; e.g.
+    "University" fixes "University, MS" but leaves "University Park, TX" alone.
+    """
+
+    def __init__(self, fixes: Dict[str, str]):
+        self.index = {fold_key(alias): replacement for alias, replacement in fixes.items()}
+
+    def resolve(self, location: str) -> str:
+        if not self.index:
+            return location
+        words = _fold_words(location)
+        replacement = self.index.get(' '.join(words))
+        if replacement is None:
+            parsed = _split_state(words)
+            if parsed is not None:
+                replacement = self.index.get(parsed[0])
+        return replacement if replacement is not None else location
+
+class RowNormalizer:
+    """Normalize (stadium, team, location) rows the way one league spec asks."""
+
+    def __init__(self, clean: bool = True, location_fixes: Optional[Dict[str, str]] = None):
+        self.clean = clean
+        self.aliases = LocationAliases(location_fixes or {})
+
+    @classmethod
+    def from_spec(cls, spec: Dict) -> 'RowNormalizer':
+        return cls(spec['clean'], spec['location_fixes'])
+
+    def normalize(self, stadium: str, team: str, location: str) -> Tuple[str, str, str]:
+        if self.clean:
+            stadium, team, location = clean_text(stadium), clean_text(team), clean_text(location)
+        return stadium, team, self.aliases.resolve(location)
+
+    def normalize_table(self, rows: Iterable[Tuple[str, str, str]]) -> List[Tuple[str, str, str]]:
+        normalize = self.normalize
+        return [normalize(*row) for row in rows]
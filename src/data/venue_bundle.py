@@ -0,0 +1,193 @@
+# venue_bundle.py
+
+"""
+Compact, content-hashed venue bundles for fast client and server startup.
+
+The pretty-printed coordinate files carry display names and timestamps the
+UI never reads at load time. This module emits, alongside them:
+
+  venues.<hash>.json   minified, merged bundle of just what the UI needs:
+                       {"v": 1, "leagues": {"nfl": [[name, team, lat, lon], ...]}}
+  venues.<hash>.bin    optional columnar binary of the same data (see below)
+  venues.manifest.json {"version": 1, "json": "venues.<hash>.json", "bin": ...}
+
+The hash is the first 10 hex digits of the file's SHA-256, so the hashed
+files can be served with an immutable cache policy and only the small
+manifest needs revalidating. Each write keeps the bundles named by the new
+manifest and the one it replaced, and deletes older ones.
+
+Binary layout (little endian):
+  magic    4s   b'SVWB'
+  version  u16
+  leagues  u16  number of leagues
+  venues   u32  number of venues
+  strings  u32  number of entries in the string table
+  league table:  per league, u16 string index of its name, u32 first venue, u32 count
+  name column:   u32 string index per venue
+  team column:   u32 string index per venue
+  lat column:    f32 per venue
+  lon column:    f32 per venue
+  string table:  u32 byte offsets (strings + 1 entries), then UTF-8 bytes
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import struct
+import sys
+from array import array
+from typing import Dict, List, Tuple
+
+from stadium_data import atomic_write_json
+
+BUNDLE_VERSION = 1
+MAGIC = b'SVWB'
+HEADER = struct.Struct('<4sHHII')
+LEAGUE_ENTRY = struct.Struct('<HII')
+MANIFEST_NAME = 'venues.manifest.json'
+COORD_DECIMALS = 5  # ~1 m, far finer than a stadium footprint
+_BUNDLE_FILE = re.compile(r'venues\.[0-9a-f]{10}\.(json|bin)')
+
+def _venue_rows(stadiums: Dict) -> List[Tuple[str, List[Tuple[str, str, float, float]]]]:
+    rows = []
+    for league, records in stadiums.items():
+        if league == 'metadata':
+            continue
+        rows.append((league, [(name, record.get('team', ''),
+                               round(record['latitude'], COORD_DECIMALS),
+                               round(record['longitude'], COORD_DECIMALS))
+                              for name, record in records.items()]))
+    return rows
+
+def build_json_bundle(stadiums: Dict) -> bytes:
+    bundle = {
+        'v': BUNDLE_VERSION,
+        'leagues': {league: [list(v) for v in venues] for league, venues in _venue_rows(stadiums)}
+    }
+    return json.dumps(bundle, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def build_binary_bundle(stadiums: Dict) -> bytes:
+    strings: List[str] = []
+    index: Dict[str, int] = {}
+
+    def intern(s: str) -> int:
+        if s not in index:
+            index[s] = len(strings)
+            strings.append(s)
+        return index[s]
+
+    league_entries = []
+    names, teams = array('I'), array('I')
+    lats, lons = array('f'), array('f')
+    for league, venues in _venue_rows(stadiums):
+        league_entries.append((intern(league), len(names), len(venues)))
+        for name, team, lat, lon in venues:
+            names.append(intern(name))
+            teams.append(intern(team))
+            lats.append(lat)
+            lons.append(lon)
+
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = array('I', [0])
+    for b in encoded:
+        offsets.append(offsets[-1] + len(b))
+
+    parts = [HEADER.pack(MAGIC, BUNDLE_VERSION, len(league_entries), len(names), len(strings))]
+    parts += [LEAGUE_ENTRY.pack(*entry) for entry in league_entries]
+    for column in (names, teams, lats, lons, offsets):
+        if sys.byteorder == 'big':
+            column.byteswap()
+        parts.append(column.tobytes())
+    parts.append(b''.join(encoded))
+    return b''.join(parts)
+
+def read_binary_bundle(data: bytes) -> Dict[str, List[Tuple[str, str, float, float]]]:
+    """Decode a binary bundle back into {league: [(name, team, lat, lon), ...]}."""
+    magic, version, league_count, venue_count, string_count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported venue bundle (magic={magic!r}, version={version})")
+    pos = HEADER.size
+    entries = []
+    for _ in range(league_count):
+        entries.append(LEAGUE_ENTRY.unpack_from(data, pos))
+        pos += LEAGUE_ENTRY.size
+
+    def column(typecode: str, count: int):
+        nonlocal pos
+        col = array(typecode)
+        col.frombytes(data[pos:pos + 4 * count])
+        if sys.byteorder == 'big':
+            col.byteswap()
+        pos += 4 * count
+        return col
+
+    names = column('I', venue_count)
+    teams = column('I', venue_count)
+    lats = column('f', venue_count)
+    lons = column('f', venue_count)
+    offsets = column('I', string_count + 1)
+    blob = data[pos:]
+    strings = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(string_count)]
+
+    return {
+        strings[league]: [(strings[names[i]], strings[teams[i]], lats[i], lons[i])
+                          for i in range(start, start + count)]
+        for league, start, count in entries
+    }
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:10]
+
+def _manifest_files(manifest: Dict) -> set:
+    return {manifest[ext] for ext in ('json', 'bin') if manifest.get(ext)}
+
+def prune_bundles(output_dir: str, keep: set) -> List[str]:
+    """Delete venues.<hash>.json/.bin files in output_dir not named in keep; return what was removed."""
+    removed = []
+    for filename in os.listdir(output_dir):
+        if _BUNDLE_FILE.fullmatch(filename) and filename not in keep:
+            os.remove(os.path.join(output_dir, filename))
+            removed.append(filename)
+    if removed:
+        logging.info(f"Removed {len(removed)} unreferenced venue bundle(s) from {output_dir}")
+    return removed
+
+def write_bundles(stadiums: Dict, output_dir: str, binary: bool = False) -> Dict:
+    """
+    Write the hashed bundle file(s) plus the manifest into output_dir and
+    return the manifest. Unchanged data produces the same file names. The
+    manifest is replaced atomically, and hashed files are then pruned down
+    to the ones it and the manifest it replaced reference, so a client that
+    loaded the previous manifest can still fetch its bundle.
+    """
+    payloads = {'json': build_json_bundle(stadiums)}
+    if binary:
+        payloads['bin'] = build_binary_bundle(stadiums)
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    previous = {}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable {manifest_path}: {e}")
+
+    manifest = {'version': BUNDLE_VERSION}
+    for ext, data in payloads.items():
+        filename = f"venues.{content_hash(data)}.{ext}"
+        path = os.path.join(output_dir, filename)
+        # Hashed files are immutable: an existing one already holds these bytes
+        if not os.path.exists(path):
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        manifest[ext] = filename
+        manifest[f"{ext}_bytes"] = len(data)
+
+    atomic_write_json(manifest, manifest_path)
+    prune_bundles(output_dir, _manifest_files(manifest) | _manifest_files(previous))
+    return manifest
@@ -0,0 +1,191 @@
+# venue_data.py
+
+"""
+venue-data: one command for the coordinate-file jobs cron and the
+validation hooks run.
+
+  python venue_data.py scrape [league_scraper options]    full scrape of every league
+  python venue_data.py refresh [league_scraper options]   incremental scrape (--incremental)
+  python venue_data.py validate [--data-dir D] [--previous-dir P]
+  python venue_data.py export --output-dir D [--binary]   content-hashed venue bundles
+  python venue_data.py enrich [--data-dir D] [--boundaries G]   add timezone, state, region
+  python venue_data.py stats [--json]
+
+Only the subcommand being run is imported, so validate, export, enrich and
+stats never load the scraper's HTTP and parsing stack and start about as
+fast as the interpreter. Logging is configured here, once, before dispatching;
+scrape and refresh also log to league_scraper.log unless --log-file says
+otherwise.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from log_setup import SCRAPER_LOG, configure_logging
+
+# Subcommands whose remaining arguments go to league_scraper.main
+SCRAPE_COMMANDS = {'scrape': [], 'refresh': ['--incremental']}
+DEFAULT_STALE_DAYS = 30
+
+def _load_outputs(data_dir: str) -> Dict[str, Dict]:
+    """{output filename: dataset} for every coordinate file present in data_dir."""
+    from leagues import LEAGUES
+    outputs = {}
+    for filename in sorted({spec['output'] for spec in LEAGUES.values()}):
+        path = os.path.join(data_dir, filename)
+        if not os.path.exists(path):
+            logging.warning(f"No existing data at {path}")
+            continue
+        with open(path, encoding='utf-8') as f:
+            outputs[filename] = json.load(f)
+    return outputs
+
+def run_scrape(command: str, scrape_args: List[str]) -> None:
+    import league_scraper
+    league_scraper.main(SCRAPE_COMMANDS[command] + scrape_args)
+
+def run_validate(args) -> int:
+    from stadium_data import previous_generation, validate_dataset
+    outputs = _load_outputs(args.data_dir)
+    if not outputs:
+        logging.error(f"No coordinate files in {args.data_dir}")
+        return 1
+    failed = 0
+    for filename, dataset in outputs.items():
+        path = os.path.join(args.previous_dir or args.data_dir, filename)
+        if not args.previous_dir:
+            # Without a baseline directory, compare against the generation this file replaced
+            path = previous_generation(path)
+        previous = None
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                previous = json.load(f)
+        errors = validate_dataset(dataset, previous)
+        for error in errors:
+            logging.error(f"{filename}: {error}")
+        records = sum(len(v) for k, v in dataset.items() if k != 'metadata')
+        baseline = f" against {path}" if previous is not None else ''
+        logging.info(f"{filename}: {records} records, {len(errors)} problems{baseline}")
+        failed += bool(errors)
+    return 1 if failed else 0
+
+def run_export(args) -> int:
+    from stadium_data import load_existing_data
+    from venue_bundle import write_bundles
+    stadiums = load_existing_data(args.data_dir)
+    if not stadiums:
+        logging.error(f"No coordinate files in {args.data_dir}")
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest = write_bundles(stadiums, args.output_dir, binary=args.binary)
+    logging.info(f"Venue bundle written: {manifest}")
+    return 0
+
+def run_enrich(args) -> int:
+    from stadium_data import save_stadium_data
+    from venue_regions import BoundaryIndex, enrich_stadiums
+    outputs = _load_outputs(args.data_dir)
+    if not outputs:
+        logging.error(f"No coordinate files in {args.data_dir}")
+        return 1
+    index = BoundaryIndex.load(args.boundaries) if args.boundaries else BoundaryIndex.load()
+    saved = []
+    for filename, dataset in outputs.items():
+        enrich_stadiums(dataset, index)
+        saved.append(save_stadium_data(dataset, os.path.join(args.data_dir, filename), force=args.force))
+    return 0 if all(saved) else 1
+
+def dataset_stats(stadiums: Dict, stale_days: float = DEFAULT_STALE_DAYS,
+                  now: Optional[datetime] = None) -> Dict[str, Dict]:
+    """Per-league counts of the things a refresh should look at."""
+    # The scraper's own threshold, so stats agree with its warnings and metrics
+    from geocoders import LOW_CONFIDENCE
+    cutoff = (now or datetime.now()) - timedelta(days=stale_days)
+    stats = {}
+    for league, records in stadiums.items():
+        venue_ids = set()
+        entry = stats[league] = {'records': len(records), 'venues': 0, 'shared': 0,
+                                 'city_centroids': 0, 'low_confidence': 0, 'stale': 0}
+        for record in records.values():
+            venue_ids.add(record.get('venue_id') or id(record))
+            entry['shared'] += bool(record.get('tenants'))
+            entry['city_centroids'] += record.get('type') == 'city'
+            confidence = record.get('confidence')
+            entry['low_confidence'] += confidence is not None and confidence < LOW_CONFIDENCE
+            try:
+                entry['stale'] += datetime.fromisoformat(record['last_verified']) < cutoff
+            except (KeyError, TypeError, ValueError):
+                entry['stale'] += 1
+        entry['venues'] = len(venue_ids)
+    return stats
+
+def run_stats(args) -> int:
+    from stadium_data import load_existing_data
+    stats = dataset_stats(load_existing_data(args.data_dir), args.stale_days)
+    if args.json:
+        print(json.dumps(stats, indent=4))
+        return 0
+    columns = ['records', 'venues', 'shared', 'city_centroids', 'low_confidence', 'stale']
+    print(f"{'league':<8}" + ''.join(f"{c:>16}" for c in columns))
+    for league, entry in stats.items():
+        print(f"{league:<8}" + ''.join(f"{entry[c]:>16}" for c in columns))
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    # Imported for the default only; stadium_data is stdlib-only
+    from stadium_data import DEFAULT_DATA_DIR
+
+    parser = argparse.ArgumentParser(prog='venue-data', description='Stadium coordinate data tasks.')
+    parser.add_argument('-v', '--verbose', action='store_true', help='log debug records')
+    parser.add_argument('-q', '--quiet', action='store_true', help='log warnings and errors only')
+    parser.add_argument('--log-file', help=f"also log here (scrape/refresh default: {SCRAPER_LOG})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for command, help_text in (('scrape', 'scrape and geocode every league'),
+                               ('refresh', 'only geocode new, changed or stale rows')):
+        commands.add_parser(command, help=f"{help_text}; other options go to league_scraper.py",
+                            add_help=False)
+
+    validate = commands.add_parser('validate', help='check the coordinate files (counts, bounds, dropped teams)')
+    validate.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    validate.add_argument('--previous-dir', help='compare against the files here instead of their .prev generation')
+
+    export = commands.add_parser('export', help='write the minified venue bundles')
+    export.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    export.add_argument('--output-dir', required=True)
+    export.add_argument('--binary', action='store_true', help='also write the columnar binary bundle')
+
+    enrich = commands.add_parser('enrich', help='add timezone, state and region to the files in place')
+    enrich.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    enrich.add_argument('--boundaries', help='state/time-zone GeoJSON (default: the bundled outlines)')
+    enrich.add_argument('--force', action='store_true', help='save even if validation fails')
+
+    stats = commands.add_parser('stats', help='per-league record, venue and freshness counts')
+    stats.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    stats.add_argument('--stale-days', type=float, default=DEFAULT_STALE_DAYS)
+    stats.add_argument('--json', action='store_true')
+    return parser
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command not in SCRAPE_COMMANDS:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+
+    level = logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO
+    log_file = args.log_file or (SCRAPER_LOG if args.command in SCRAPE_COMMANDS else None)
+    configure_logging(level, log_file)
+
+    if args.command in SCRAPE_COMMANDS:
+        run_scrape(args.command, extra)
+        return 0
+    commands = {'validate': run_validate, 'export': run_export, 'enrich': run_enrich, 'stats': run_stats}
+    return commands[args.command](args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+# venue_dedupe.py
+
+"""
+Shared-venue detection across leagues.
+
+The same physical stadium shows up in several tables (Allegiant Stadium in
+the NFL and NCAA lists, Bank of America Stadium in the NFL and MLS lists).
+annotate_venues() clusters records that sit within radius_km of each other
+and have similar names, then gives every record:
+
+  venue_id  stable ID shared by every record of one venue ("v" + 10 hex).
+            Taken from the record itself or the previous dataset when
+            either already has one, so IDs survive renames and re-geocoding.
+  tenants   only on shared venues: every [league, team] playing there.
+
+Members of a cluster also take the coordinates of its highest-confidence
+member, so downstream weather requests see one location per venue.
+
+venue_key() is the cheaper name-and-location key the scraper uses to
+geocode a venue once per run even when several leagues list it.
+"""
+
+import hashlib
+import logging
+import math
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+from stadium_data import distance_km
+from text_normalize import fold_key, location_key
+
+DEFAULT_RADIUS_KM = 0.5
+NAME_SIMILARITY = 0.6
+_CELL_DEG = 0.01  # ~1.1 km, comfortably larger than DEFAULT_RADIUS_KM
+# Ignored when comparing names, so neighbours like Arrowhead Stadium and
+# Kauffman Stadium aren't "similar" just for sharing a suffix
+_GENERIC_WORDS = {'stadium', 'field', 'park', 'ballpark', 'arena', 'center', 'centre',
+                  'bowl', 'dome', 'coliseum', 'the', 'at', 'of', 'and'}
+
+Member = Tuple[str, str]  # (league, stadium name)
+
+def venue_key(stadium_name: str, location: str) -> Tuple[str, str]:
+    """
+    (folded name, location_key) for a scraped row. The city is part of the
+    key: names like "Memorial Stadium" repeat within a state, and rows that
+    share a key share one geocode. A shared venue whose leagues spell its
+    city differently ("Paradise, Nevada" vs "Las Vegas, NV") is geocoded
+    once per spelling and joined afterwards by annotate_venues().
+    """
+    return fold_key(stadium_name), location_key(location)
+
+def _distinctive(name: str) -> str:
+    words = fold_key(name).split()
+    return ' '.join(w for w in words if w not in _GENERIC_WORDS) or ' '.join(words)
+
+def _similar(a: str, b: str) -> bool:
+    return SequenceMatcher(None, _distinctive(a), _distinctive(b)).ratio() >= NAME_SIMILARITY
+
+def cluster_venues(stadiums: Dict, radius_km: float = DEFAULT_RADIUS_KM) -> List[List[Member]]:
+    """
+    Group records into venues. Two records join when they are within
+    radius_km and their names are similar; the name test keeps apart
+    different schools that both fell back to the same city centroid.
+    Clusters and their members come out in league/table order.
+    """
+    members: List[Member] = []
+    points: List[Tuple[float, float]] = []
+    for league, records in stadiums.items():
+        if league == 'metadata':
+            continue
+        for name, record in records.items():
+            members.append((league, name))
+            points.append((float(record['latitude']), float(record['longitude'])))
+
+    parent = list(range(len(members)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Grid buckets keep this near-linear; neighbours are always in adjacent cells
+    grid: Dict[Tuple[int, int], List[int]] = {}
+    for i, (lat, lon) in enumerate(points):
+        grid.setdefault((math.floor(lat / _CELL_DEG), math.floor(lon / _CELL_DEG)), []).append(i)
+    for (row, col), cell in grid.items():
+        nearby = [j for dr in (-1, 0, 1) for dc in (-1, 0, 1) for j in grid.get((row + dr, col + dc), ())]
+        for i in cell:
+            for j in nearby:
+                if j <= i or find(i) == find(j):
+                    continue
+                if (distance_km(*points[i], *points[j]) <= radius_km and
+                        _similar(members[i][1], members[j][1])):
+                    parent[find(j)] = find(i)
+
+    # Keyed by root but filled in member order, so clusters keep league/table order
+    clusters: Dict[int, List[Member]] = {}
+    for i, member in enumerate(members):
+        clusters.setdefault(find(i), []).append(member)
+    return list(clusters.values())
+
+def new_venue_id(name: str, lat: float, lon: float) -> str:
+    digest = hashlib.sha1(f"{fold_key(name)}|{lat:.2f}|{lon:.2f}".encode('utf-8')).hexdigest()
+    return 'v' + digest[:10]
+
+def annotate_venues(stadiums: Dict, previous: Optional[Dict] = None,
+                    radius_km: float = DEFAULT_RADIUS_KM) -> Dict[str, int]:
+    """Add venue_id (and tenants on shared venues) to every record in place; return counts."""
+    previous_ids = {}
+    for league, records in (previous or {}).items():
+        if league == 'metadata':
+            continue
+        for name, record in records.items():
+            if record.get('venue_id'):
+                previous_ids[(league, fold_key(name))] = record['venue_id']
+
+    used = set()
+    shared = 0
+    clusters = cluster_venues(stadiums, radius_km)
+    for cluster in clusters:
+        records = [stadiums[league][name] for league, name in cluster]
+        known = [record.get('venue_id') or previous_ids.get((league, fold_key(name)))
+                 for (league, name), record in zip(cluster, records)]
+        venue_id = next((v for v in known if v and v not in used), None)
+        if venue_id is None:
+            first = records[0]
+            venue_id = new_venue_id(cluster[0][1], first['latitude'], first['longitude'])
+            while venue_id in used:
+                venue_id = new_venue_id(venue_id, first['latitude'], first['longitude'])
+        used.add(venue_id)
+
+        if len(cluster) > 1:
+            shared += 1
+            best = max(records, key=lambda r: r.get('confidence') or 0.0)
+            tenants = sorted([league, record.get('team', '')] for (league, _), record in zip(cluster, records))
+        for record in records:
+            record['venue_id'] = venue_id
+            if len(cluster) > 1:
+                record['latitude'] = best['latitude']
+                record['longitude'] = best['longitude']
+                record['tenants'] = tenants
+            else:
+                record.pop('tenants', None)
+
+    stats = {'records': sum(len(c) for c in clusters), 'venues': len(clusters), 'shared': shared}
+    logging.info(f"Venues: {stats['records']} records at {stats['venues']} venues "
+                 f"({stats['shared']} shared between teams or leagues)")
+    return stats
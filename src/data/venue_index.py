@@ -0,0 +1,188 @@
+# venue_index.py
+
+"""
+Spatial index over every league's venues for nearest / within-radius queries.
+
+Venues are held in flat NumPy arrays (no per-venue dicts) and bucketed into
+a fixed lat/lon grid stored CSR-style: venue indices sorted by cell, plus a
+cell -> (start, end) slice table. A radius query only computes haversine
+distances for venues in the cells overlapping the query's bounding box.
+For bulk lookups, nearest_many() answers a whole batch of points with one
+vectorized distance matrix per chunk.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from stadium_data import DEFAULT_DATA_DIR, EARTH_RADIUS_KM, load_existing_data
+
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Array form of stadium_data.distance_km; any argument may be an array."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+class VenueIndex:
+    def __init__(self, names: Sequence[str], leagues: Sequence[str], teams: Sequence[str],
+                 lat: Sequence[float], lon: Sequence[float], cell_deg: float = 1.0,
+                 max_ring: int = 3):
+        self.names = np.asarray(names, dtype=object)
+        self.leagues = np.asarray(leagues, dtype=object)
+        self.teams = np.asarray(teams, dtype=object)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.cell_deg = cell_deg
+        # Ring searches wider than this fall back to a full vectorized scan
+        self.max_ring = max_ring
+
+        rows = np.floor(self.lat / cell_deg).astype(np.int64)
+        cols = np.floor(self.lon / cell_deg).astype(np.int64)
+        self.order = np.lexsort((cols, rows))
+        sorted_rows, sorted_cols = rows[self.order], cols[self.order]
+        self.cells: Dict[tuple, tuple] = {}
+        if len(self.order):
+            change = np.flatnonzero((np.diff(sorted_rows) != 0) | (np.diff(sorted_cols) != 0)) + 1
+            starts = np.concatenate(([0], change))
+            ends = np.concatenate((change, [len(self.order)]))
+            for start, end in zip(starts, ends):
+                self.cells[(int(sorted_rows[start]), int(sorted_cols[start]))] = (int(start), int(end))
+
+        # Unit vectors for batch queries: chord distance is monotonic in great-circle distance
+        lat_r, lon_r = np.radians(self.lat), np.radians(self.lon)
+        self.xyz = np.column_stack((np.cos(lat_r) * np.cos(lon_r),
+                                    np.cos(lat_r) * np.sin(lon_r),
+                                    np.sin(lat_r)))
+
+    @classmethod
+    def from_data(cls, stadiums: Dict, **kwargs) -> 'VenueIndex':
+        names, leagues, teams, lat, lon = [], [], [], [], []
+        for league, records in stadiums.items():
+            if league == 'metadata':
+                continue
+            for name, record in records.items():
+                names.append(name)
+                leagues.append(league)
+                teams.append(record.get('team', ''))
+                lat.append(record['latitude'])
+                lon.append(record['longitude'])
+        return cls(names, leagues, teams, lat, lon, **kwargs)
+
+    @classmethod
+    def from_files(cls, data_dir: str = DEFAULT_DATA_DIR, **kwargs) -> 'VenueIndex':
+        return cls.from_data(load_existing_data(data_dir), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    # ------------------------------------------------------------
+    # QUERIES
+    # ------------------------------------------------------------
+    def _candidates(self, lat: float, lon: float, lat_span: float, lon_span: float) -> np.ndarray:
+        """Indices of venues in every grid cell overlapping the given bounding box."""
+        r0 = math.floor((lat - lat_span) / self.cell_deg)
+        r1 = math.floor((lat + lat_span) / self.cell_deg)
+        c0 = math.floor((lon - lon_span) / self.cell_deg)
+        c1 = math.floor((lon + lon_span) / self.cell_deg)
+        slices = []
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > len(self.cells):
+            # Box covers more cells than exist; scan the occupied ones instead
+            for (r, c), (start, end) in self.cells.items():
+                if r0 <= r <= r1 and c0 <= c <= c1:
+                    slices.append(self.order[start:end])
+        else:
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    span = self.cells.get((r, c))
+                    if span:
+                        slices.append(self.order[span[0]:span[1]])
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def _lon_span(self, lat: float, radius_km: float) -> float:
+        cos_lat = math.cos(math.radians(min(89.0, abs(lat) + radius_km / KM_PER_DEG_LAT)))
+        return min(180.0, radius_km / (KM_PER_DEG_LAT * cos_lat))
+
+    def _results(self, idx: np.ndarray, dist: np.ndarray) -> List[Dict]:
+        return [{'name': self.names[i], 'league': self.leagues[i], 'team': self.teams[i],
+                 'latitude': float(self.lat[i]), 'longitude': float(self.lon[i]),
+                 'distance_km': float(d)}
+                for i, d in zip(idx, dist)]
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> List[Dict]:
+        """All venues within radius_km of (lat, lon), nearest first."""
+        lat_span = radius_km / KM_PER_DEG_LAT
+        idx = self._candidates(lat, lon, lat_span, self._lon_span(lat, radius_km))
+        if not len(idx):
+            return []
+        dist = haversine_km(lat, lon, self.lat[idx], self.lon[idx])
+        keep = dist <= radius_km
+        idx, dist = idx[keep], dist[keep]
+        order = np.argsort(dist, kind='stable')
+        return self._results(idx[order], dist[order])
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Dict]:
+        """The k venues closest to (lat, lon), nearest first."""
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+        for ring in range(1, self.max_ring + 1):
+            # Everything within radius_km is guaranteed to be inside the box searched
+            radius_km = ring * self.cell_deg * KM_PER_DEG_LAT
+            lat_span = ring * self.cell_deg
+            idx = self._candidates(lat, lon, lat_span, self._lon_span(lat, radius_km))
+            if len(idx) < k:
+                continue
+            dist = haversine_km(lat, lon, self.lat[idx], self.lon[idx])
+            top = np.argpartition(dist, k - 1)[:k]
+            if dist[top].max() <= radius_km:
+                top = top[np.argsort(dist[top], kind='stable')]
+                return self._results(idx[top], dist[top])
+        return self._nearest_scan(lat, lon, k)
+
+    def _nearest_scan(self, lat: float, lon: float, k: int) -> List[Dict]:
+        dist = haversine_km(lat, lon, self.lat, self.lon)
+        top = np.argpartition(dist, k - 1)[:k]
+        top = top[np.argsort(dist[top], kind='stable')]
+        return self._results(top, dist[top])
+
+    def nearest_many(self, lats: Sequence[float], lons: Sequence[float], k: int = 1,
+                     chunk: int = 4096):
+        """
+        Batch nearest-k for many points. Returns (indices, distances_km), each
+        of shape (n_points, k); look up names with index.names[indices]. k is
+        capped at the number of venues, so an empty index gives (n_points, 0).
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        k = max(0, min(k, len(self)))
+        out_idx = np.empty((len(lats), k), dtype=np.int64)
+        out_dist = np.empty((len(lats), k), dtype=np.float64)
+        if k == 0:
+            return out_idx, out_dist
+        for start in range(0, len(lats), chunk):
+            lat_r = np.radians(lats[start:start + chunk])
+            lon_r = np.radians(lons[start:start + chunk])
+            q = np.column_stack((np.cos(lat_r) * np.cos(lon_r),
+                                 np.cos(lat_r) * np.sin(lon_r),
+                                 np.sin(lat_r)))
+            # Larger dot product = closer; take the top k per row
+            dots = q @ self.xyz.T
+            top = np.argpartition(-dots, k - 1, axis=1)[:, :k]
+            top_dots = np.take_along_axis(dots, top, axis=1)
+            order = np.argsort(-top_dots, axis=1, kind='stable')
+            top = np.take_along_axis(top, order, axis=1)
+            angle = np.arccos(np.clip(np.take_along_axis(top_dots, order, axis=1), -1.0, 1.0))
+            out_idx[start:start + len(q)] = top
+            out_dist[start:start + len(q)] = angle * EARTH_RADIUS_KM
+        return out_idx, out_dist
+
+    def find(self, name: str, league: Optional[str] = None) -> Optional[int]:
+        """Index of a venue by name (and optionally league), or None."""
+        matches = np.flatnonzero(self.names == name)
+        if league is not None:
+            matches = matches[self.leagues[matches] == league]
+        return int(matches[0]) if len(matches) else None
@@ -0,0 +1,268 @@
+# venue_regions.py
+
+"""
+Offline state, time-zone and region lookup for venue coordinates.
+
+The bundled us_boundaries.geojson holds one polygon per state (plus the
+Canadian provinces with MLS venues), each tagged with its postal code,
+country and IANA time zone. States split between zones get an extra piece
+for the minority zone; pieces come first in the file and the first polygon
+holding a point wins, so they override the whole-state polygon. The
+outlines are simplified (typically within 0.05-0.2 degrees of the real
+border, closer where a border runs past a venue); any GeoJSON with the same
+properties, e.g. Census state shapes split on timezone-boundary-builder
+zones, can be used instead via --boundaries.
+
+enrich_stadiums() runs after geocoding and adds to every record:
+
+  timezone  IANA zone, e.g. America/Chicago
+  state     postal code of the state or province the point falls in
+  region    Census region (Northeast, Midwest, South, West) or Canada
+
+Polygons are indexed by bounding box in an R-tree, so a lookup only runs
+the point-in-polygon test on the one or two polygons whose box holds the
+point. A point just offshore (a lakefront or bayside venue against a
+simplified coast) takes the nearest polygon within SNAP_KM.
+
+  python venue_regions.py 41.8623 -87.6167
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from run_metrics import METRICS
+from stadium_data import EARTH_RADIUS_KM
+from text_normalize import fold_key, parse_city_state
+from us_states import CENSUS_REGIONS
+
+DEFAULT_BOUNDARIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'us_boundaries.geojson')
+REGION_FIELDS = ('timezone', 'state', 'region')
+SNAP_KM = 25.0
+NODE_SIZE = 8
+# Lookups are cached per point at this many decimals (~1 m)
+_COORD_DECIMALS = 5
+# Provinces a listed location can name, for the mismatch check
+_PROVINCES = {'british columbia': 'BC', 'ontario': 'ON', 'quebec': 'QC'}
+
+Box = Tuple[float, float, float, float]  # (min lon, min lat, max lon, max lat)
+Ring = List[Tuple[float, float]]         # closed (lon, lat) ring
+
+class RTree:
+    """
+    Static R-tree over bounding boxes, bulk-loaded with Sort-Tile-Recursive
+    packing: boxes are sorted into vertical slices by center x, each slice
+    by center y, and packed NODE_SIZE to a node, one level at a time.
+    """
+
+    def __init__(self, boxes: Sequence[Box], node_size: int = NODE_SIZE):
+        self.node_size = node_size
+        # A node is (box, children, leaf); leaf children are (box, item index)
+        level = [(box, i) for i, box in enumerate(boxes)]
+        leaf = True
+        while True:
+            level = [(_union(child[0] for child in group), group, leaf) for group in self._pack(level)]
+            leaf = False
+            if len(level) <= 1:
+                break
+        self.root = level[0] if level else None
+
+    def _pack(self, entries: List) -> List[List]:
+        size = self.node_size
+        slices = max(1, math.ceil(math.sqrt(math.ceil(len(entries) / size))))
+        per_slice = slices * size
+        entries = sorted(entries, key=lambda e: e[0][0] + e[0][2])
+        groups = []
+        for start in range(0, len(entries), per_slice):
+            column = sorted(entries[start:start + per_slice], key=lambda e: e[0][1] + e[0][3])
+            groups.extend(column[i:i + size] for i in range(0, len(column), size))
+        return groups
+
+    def query(self, box: Box) -> List[int]:
+        """Indexes of the boxes intersecting box."""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_box, children, leaf = stack.pop()
+            if not _intersects(node_box, box):
+                continue
+            if leaf:
+                found.extend(i for child_box, i in children if _intersects(child_box, box))
+            else:
+                stack.extend(children)
+        return found
+
+def _union(boxes: Iterable[Box]) -> Box:
+    min_x, min_y, max_x, max_y = zip(*boxes)
+    return min(min_x), min(min_y), max(max_x), max(max_y)
+
+def _intersects(a: Box, b: Box) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+def _in_ring(x: float, y: float, ring: Ring) -> bool:
+    inside = False
+    x1, y1 = ring[-1]
+    for x2, y2 in ring:
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+def point_in_polygon(x: float, y: float, rings: Sequence[Ring]) -> bool:
+    """Even-odd test against an outer ring and its holes."""
+    return _in_ring(x, y, rings[0]) and not any(_in_ring(x, y, hole) for hole in rings[1:])
+
+def _edge_distance_km(lat: float, lon: float, rings: Sequence[Ring]) -> float:
+    # Planar distance to the nearest edge with longitude scaled at lat; fine at SNAP_KM scale
+    scale = math.cos(math.radians(lat))
+    km_per_deg = math.radians(EARTH_RADIUS_KM)
+    best = math.inf
+    for ring in rings:
+        for (x1, y1), (x2, y2) in zip(ring, ring[1:]):
+            ax, ay = (x1 - lon) * scale, y1 - lat
+            dx, dy = (x2 - x1) * scale, y2 - y1
+            length = dx * dx + dy * dy
+            t = max(0.0, min(1.0, -(ax * dx + ay * dy) / length)) if length else 0.0
+            best = min(best, math.hypot(ax + t * dx, ay + t * dy))
+    return best * km_per_deg
+
+class BoundaryIndex:
+    def __init__(self, features: List[Tuple[Dict, List[List[Ring]]]], snap_km: float = SNAP_KM):
+        """features: (properties, polygons) in priority order; each polygon is [outer, *holes]."""
+        self.snap_km = snap_km
+        self.polygons: List[Tuple[int, List[Ring]]] = []
+        boxes = []
+        for feature_index, (_, polygons) in enumerate(features):
+            for rings in polygons:
+                xs, ys = zip(*rings[0])
+                self.polygons.append((feature_index, rings))
+                boxes.append((min(xs), min(ys), max(xs), max(ys)))
+        self.properties = [properties for properties, _ in features]
+        self.tree = RTree(boxes)
+        self.cache: Dict[Tuple[float, float], Optional[Dict]] = {}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_BOUNDARIES_PATH, snap_km: float = SNAP_KM) -> 'BoundaryIndex':
+        """Read a GeoJSON FeatureCollection of Polygon/MultiPolygon features."""
+        with open(path, encoding='utf-8') as f:
+            collection = json.load(f)
+        features = []
+        for feature in collection['features']:
+            geometry = feature['geometry']
+            if geometry['type'] == 'Polygon':
+                polygons = [geometry['coordinates']]
+            elif geometry['type'] == 'MultiPolygon':
+                polygons = geometry['coordinates']
+            else:
+                logging.warning(f"Skipping {geometry['type']} feature in {path}")
+                continue
+            features.append((feature['properties'],
+                             [[[tuple(point[:2]) for point in ring] for ring in polygon] for polygon in polygons]))
+        index = cls(features, snap_km)
+        logging.debug(f"Loaded {len(features)} boundary features ({len(index.polygons)} polygons) from {path}")
+        return index
+
+    def lookup(self, lat: float, lon: float) -> Optional[Dict]:
+        """Properties of the first feature holding the point (or the nearest within snap_km), else None."""
+        key = (round(lat, _COORD_DECIMALS), round(lon, _COORD_DECIMALS))
+        if key not in self.cache:
+            self.cache[key] = self._lookup(lat, lon)
+        return self.cache[key]
+
+    def _lookup(self, lat: float, lon: float) -> Optional[Dict]:
+        # Polygon indexes follow feature order, so sorting them keeps the priority
+        candidates = sorted(self.tree.query((lon, lat, lon, lat)))
+        for i in candidates:
+            feature_index, rings = self.polygons[i]
+            if point_in_polygon(lon, lat, rings):
+                return self.properties[feature_index]
+        dlat = self.snap_km / math.radians(EARTH_RADIUS_KM)
+        dlon = dlat / max(0.01, math.cos(math.radians(lat)))
+        nearby = sorted(self.tree.query((lon - dlon, lat - dlat, lon + dlon, lat + dlat)))
+        best, best_km = None, self.snap_km
+        for i in nearby:
+            feature_index, rings = self.polygons[i]
+            km = _edge_distance_km(lat, lon, rings)
+            if km <= best_km:
+                best, best_km = feature_index, km
+        if best is None:
+            return None
+        logging.debug(f"({lat}, {lon}) is outside every boundary; using {self.properties[best]} "
+                      f"{best_km:.1f} km away")
+        return self.properties[best]
+
+def regions_for(properties: Dict) -> Dict[str, str]:
+    """The record fields for one boundary feature's properties."""
+    state = properties.get('state')
+    region = CENSUS_REGIONS.get(state) if properties.get('country', 'US') == 'US' else 'Canada'
+    fields = {'timezone': properties.get('tzid'), 'state': state, 'region': region}
+    return {field: value for field, value in fields.items() if value}
+
+def listed_state(location: str) -> Optional[str]:
+    """State or province code named at the end of a scraped location, if any."""
+    parsed = parse_city_state(location)
+    if parsed:
+        return parsed[1]
+    folded = fold_key(location)
+    return next((code for name, code in _PROVINCES.items() if folded.endswith(name)), None)
+
+def enrich_stadiums(stadiums: Dict, index: Optional[BoundaryIndex] = None,
+                    previous: Optional[Dict] = None) -> Dict[str, int]:
+    """
+    Add timezone, state and region to every record in place; return counts.
+    A record whose coordinates match its previous version keeps the previous
+    values without a lookup. A record whose polygon disagrees with the state
+    in its location is logged: it is usually a bad geocode.
+    """
+    stats = {'records': 0, 'looked_up': 0, 'reused': 0, 'unmatched': 0, 'mismatched': 0}
+    for league, records in stadiums.items():
+        if league == 'metadata':
+            continue
+        earlier = (previous or {}).get(league) or {}
+        for name, record in records.items():
+            stats['records'] += 1
+            lat, lon = float(record['latitude']), float(record['longitude'])
+            old = earlier.get(name)
+            if (old and old.get('timezone') and
+                    (float(old['latitude']), float(old['longitude'])) == (lat, lon)):
+                fields = {field: old[field] for field in REGION_FIELDS if old.get(field)}
+                stats['reused'] += 1
+            else:
+                if index is None:
+                    index = BoundaryIndex.load()
+                properties = index.lookup(lat, lon)
+                stats['looked_up'] += 1
+                if properties is None:
+                    for field in REGION_FIELDS:
+                        record.pop(field, None)
+                    logging.warning(f"{league}: {name} ({lat}, {lon}) is outside every known boundary")
+                    stats['unmatched'] += 1
+                    continue
+                fields = regions_for(properties)
+            record.update(fields)
+            listed = listed_state(record.get('location', ''))
+            if listed and fields.get('state') and listed != fields['state']:
+                logging.warning(f"{league}: {name} is listed in {listed} but its coordinates "
+                                f"({lat}, {lon}) are in {fields['state']}")
+                stats['mismatched'] += 1
+    METRICS.incr('region_lookups', stats['looked_up'])
+    METRICS.incr('region_mismatches', stats['mismatched'])
+    logging.info(f"Regions: {stats['records']} records, {stats['looked_up']} looked up, "
+                 f"{stats['reused']} reused, {stats['unmatched']} unmatched, "
+                 f"{stats['mismatched']} not in their listed state")
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Look up the state, time zone and region of a point.')
+    parser.add_argument('latitude', type=float)
+    parser.add_argument('longitude', type=float)
+    parser.add_argument('--boundaries', default=DEFAULT_BOUNDARIES_PATH)
+    args = parser.parse_args(argv)
+    properties = BoundaryIndex.load(args.boundaries).lookup(args.latitude, args.longitude)
+    print(json.dumps(regions_for(properties) if properties else None))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+# weather_service.py
+
+"""
+Venue-weather HTTP service, so browsers share one cached forecast per venue
+instead of each calling OpenWeatherMap once per card.
+
+  GET /weather/{league}/{stadium}?date=YYYY-MM-DD   one venue
+  GET /weather/{league}?date=YYYY-MM-DD             every venue in a league
+  GET /health                                       venue, cache and upstream counts
+  GET /metrics                                      Prometheus text
+
+Venues are loaded from the scraper's coordinate files and snapped to the
+same forecast cells as forecast_bundle.py, so venues in one cell (shared
+NFL/MLS stadiums, same-city parks) share one upstream forecast. A response
+window is one venue-local day: the 3-hour slots falling on that date plus
+the slot closest to local noon (what the weather cards show today). Windows
+are kept in a bounded LRU cache keyed on (cell, date), with a TTL. Dates
+are normalized to YYYY-MM-DD, and ones outside the forecast (before
+yesterday or more than FORECAST_DAYS ahead, UTC) get a 400 without ever
+going upstream.
+
+Concurrent misses for a cell wait on a single in-flight upstream call, and
+that call fills the cache for every date the forecast covers. Upstream
+requests run on a thread pool through ForecastFetcher, keeping the per-host
+rate limit, retries and circuit breaker; the event loop itself only does
+dictionary lookups and JSON encoding, so latency stays flat as clients grow.
+
+  OPENWEATHER_API_KEY=... python weather_service.py --port 8090
+  python weather_service.py --base-url http://127.0.0.1:8089/forecast --api-key test
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from forecast_bundle import DEFAULT_GRID_DEG, FORECAST_URL, ForecastFetcher, cell_id, snap_to_cell
+from log_setup import configure_logging
+from run_metrics import METRICS
+from stadium_data import DEFAULT_DATA_DIR
+from stadium_records import load_stadiums
+from text_normalize import fold_key
+
+DEFAULT_TTL = 600.0  # OpenWeatherMap refreshes its 5-day forecast every few hours
+DEFAULT_MAX_ENTRIES = 4096
+MAX_HEADER_LINES = 100
+# OpenWeatherMap's 5-day / 3-hour forecast; dates past it never have slots
+FORECAST_DAYS = 5
+_DAY = 86400
+METRICS_PREFIX = 'svw_weather'
+METRICS_HELP = {
+    'run_duration_seconds': 'Seconds the weather service has been running.',
+    'run_start_timestamp_seconds': 'Unix time the weather service started.',
+    'stage_calls_total': 'Requests served and upstream forecast calls made, per stage.',
+    'stage_seconds_total': 'Total seconds spent per request or upstream stage.',
+    'stage_seconds_max': 'Slowest single request or upstream call per stage.',
+}
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries also expire ttl seconds after being
+    stored. Not thread-safe: WeatherService only touches it on the event loop.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.entries: 'OrderedDict[Tuple, Tuple[float, Dict]]' = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[Dict]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self.clock():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: Tuple, value: Dict) -> None:
+        self.entries[key] = (self.clock() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+def _local_offset(lon: float) -> int:
+    """Seconds from UTC to mean solar time at lon; close enough to pick a venue's day."""
+    return round(lon * 240)
+
+def forecast_windows(slots: List[Dict], lon: float) -> Dict[str, Dict]:
+    """Split a forecast series into {date: window} on venue-local days."""
+    offset = _local_offset(lon)
+    by_date: Dict[str, List[Dict]] = {}
+    for slot in slots:
+        day = datetime.fromtimestamp(slot['dt'] + offset, timezone.utc).strftime('%Y-%m-%d')
+        by_date.setdefault(day, []).append(slot)
+    return {day: window(day, day_slots, lon) for day, day_slots in by_date.items()}
+
+def window(day: str, slots: List[Dict], lon: float) -> Dict:
+    noon = int(datetime.strptime(day, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()) + _DAY // 2
+    noon -= _local_offset(lon)
+    closest = min(slots, key=lambda slot: abs(slot['dt'] - noon)) if slots else None
+    return {'date': day, 'forecast': closest, 'slots': slots}
+
+class UpstreamError(Exception):
+    """The forecast for a cell could not be fetched."""
+
+class WeatherService:
+    def __init__(self, stadiums: Dict, fetcher: ForecastFetcher, grid_deg: float = DEFAULT_GRID_DEG,
+                 cache: Optional[TTLCache] = None):
+        self.fetcher = fetcher
+        self.cache = cache if cache is not None else TTLCache()
+        self.pool = ThreadPoolExecutor(max_workers=fetcher.max_workers)
+        # cell id -> future for the upstream call in flight
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.cells: Dict[str, Tuple[float, float]] = {}
+        # league -> {folded stadium name: (stadium, record, cell id)}, in table order
+        self.venues: Dict[str, Dict[str, Tuple[str, Dict, str]]] = {}
+        for league, records in stadiums.items():
+            if league == 'metadata':
+                continue
+            venues = self.venues[league] = {}
+            for name, record in records.items():
+                cell = snap_to_cell(record['latitude'], record['longitude'], grid_deg)
+                key = cell_id(cell)
+                self.cells[key] = cell
+                venues[fold_key(name)] = (name, record, key)
+        logging.info(f"Serving {sum(len(v) for v in self.venues.values())} venues "
+                     f"in {len(self.cells)} forecast cells")
+
+    async def _fetch(self, key: str) -> Dict[str, Dict]:
+        """Fetch a cell once for every waiter and cache each date it covers."""
+        future = self.inflight.get(key)
+        if future is not None:
+            METRICS.incr('weather_cache', result='coalesced')
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = self.inflight[key] = loop.create_future()
+        try:
+            slots = await loop.run_in_executor(self.pool, self.fetcher.fetch_cell, self.cells[key])
+            if slots is None:
+                raise UpstreamError(f"No forecast for cell {key}")
+            windows = forecast_windows(slots, self.cells[key][1])
+            for day, day_window in windows.items():
+                self.cache.put((key, day), day_window)
+            future.set_result(windows)
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieved here so a failure nobody else awaited isn't logged as unhandled
+            future.exception()
+        finally:
+            del self.inflight[key]
+            if not future.done():
+                # This task was cancelled mid-fetch; fail the coalesced waiters rather than strand them
+                future.set_exception(UpstreamError(f"Fetch for cell {key} was cancelled"))
+                future.exception()
+        return future.result()
+
+    async def forecast_for(self, key: str, day: str) -> Dict:
+        cached = self.cache.get((key, day))
+        if cached is not None:
+            METRICS.incr('weather_cache', result='hit')
+            return cached
+        METRICS.incr('weather_cache', result='miss')
+        windows = await self._fetch(key)
+        if day in windows:
+            return windows[day]
+        # Outside the forecast's range; cached too so repeats don't go upstream
+        empty = window(day, [], self.cells[key][1])
+        self.cache.put((key, day), empty)
+        return empty
+
+    def _venue_response(self, league: str, name: str, record: Dict, key: str, forecast: Dict) -> Dict:
+        response = {'league': league, 'stadium': name, 'team': record.get('team'),
+                    'latitude': record['latitude'], 'longitude': record['longitude'], 'cell': key}
+        if record.get('venue_id'):
+            response['venue_id'] = record['venue_id']
+        response.update(forecast)
+        return response
+
+    async def venue_weather(self, league: str, stadium: str, day: str) -> Tuple[int, Dict]:
+        venue = self.venues.get(league, {}).get(fold_key(stadium))
+        if venue is None:
+            return HTTPStatus.NOT_FOUND, {'error': f"Unknown venue {league}/{stadium}"}
+        name, record, key = venue
+        try:
+            forecast = await self.forecast_for(key, day)
+        except UpstreamError as e:
+            return HTTPStatus.BAD_GATEWAY, {'error': str(e)}
+        return HTTPStatus.OK, self._venue_response(league, name, record, key, forecast)
+
+    async def league_weather(self, league: str, day: str) -> Tuple[int, Dict]:
+        venues = self.venues.get(league)
+        if venues is None:
+            return HTTPStatus.NOT_FOUND, {'error': f"Unknown league {league}"}
+        # Venues in one cell coalesce onto the same upstream call
+        results = await asyncio.gather(*(self.forecast_for(key, day) for _, _, key in venues.values()),
+                                       return_exceptions=True)
+        out = []
+        for (name, record, key), result in zip(venues.values(), results):
+            if isinstance(result, Exception):
+                out.append({'league': league, 'stadium': name, 'error': str(result)})
+            else:
+                out.append(self._venue_response(league, name, record, key, result))
+        return HTTPStatus.OK, {'league': league, 'date': day, 'venues': out}
+
+    def health(self) -> Dict:
+        return {
+            'venues': sum(len(v) for v in self.venues.values()),
+            'cells': len(self.cells),
+            'cache_entries': len(self.cache),
+            'inflight': len(self.inflight),
+            'upstream_requests': self.fetcher.requests_made,
+            'upstream_failures': self.fetcher.failures
+        }
+
+    async def route(self, method: str, target: str) -> Tuple[int, object]:
+        if method != 'GET':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Only GET is supported'}
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+        if parts == ['health']:
+            return HTTPStatus.OK, self.health()
+        if parts == ['metrics']:
+            return HTTPStatus.OK, METRICS.to_prometheus(METRICS_PREFIX, METRICS_HELP)
+        if parts[0] != 'weather' or len(parts) not in (2, 3):
+            return HTTPStatus.NOT_FOUND, {'error': 'Not found'}
+
+        today = datetime.now(timezone.utc).date()
+        day = parse_qs(url.query).get('date', [None])[0]
+        if day is None:
+            day = today.isoformat()
+        else:
+            try:
+                requested = datetime.strptime(day, '%Y-%m-%d').date()
+            except ValueError:
+                return HTTPStatus.BAD_REQUEST, {'error': f"Invalid date {day!r}; expected YYYY-MM-DD"}
+            # Checked before any cache miss can reach upstream; a venue-local day
+            # west of UTC can still be yesterday's UTC date
+            if not -1 <= (requested - today).days <= FORECAST_DAYS:
+                return HTTPStatus.BAD_REQUEST, {'error': f"Date {day!r} is outside the "
+                                                         f"{FORECAST_DAYS}-day forecast"}
+            # Zero-padded, so 2026-1-5 matches the window keys
+            day = requested.isoformat()
+
+        league = parts[1].lower()
+        with METRICS.span('weather_request', kind='league' if len(parts) == 2 else 'venue'):
+            if len(parts) == 2:
+                return await self.league_weather(league, day)
+            return await self.venue_weather(league, parts[2], day)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Minimal HTTP/1.1: GET only, keep-alive, no request bodies."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': 'Malformed request'}, False)
+                    break
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                try:
+                    status, payload = await self.route(method, target)
+                except Exception as e:
+                    logging.error(f"Error handling {target}: {e}")
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'Internal error'}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: object, keep_alive: bool) -> None:
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+            content_type = 'text/plain; version=0.0.4'
+        else:
+            body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+            content_type = 'application/json'
+        status = HTTPStatus(status)
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            # The app calls this from the browser
+            'Access-Control-Allow-Origin: *',
+            (f"Cache-Control: public, max-age={int(self.cache.ttl)}" if status == HTTPStatus.OK
+             else 'Cache-Control: no-store'),
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False)
+
+async def serve(service: WeatherService, host: str, port: int) -> None:
+    server = await asyncio.start_server(service.handle, host, port)
+    address = server.sockets[0].getsockname()
+    logging.info(f"Weather service listening on http://{address[0]}:{address[1]}/weather/")
+    async with server:
+        await server.serve_forever()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Serve cached per-venue forecasts over HTTP.')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--grid-deg', type=float, default=DEFAULT_GRID_DEG)
+    parser.add_argument('--units', choices=['imperial', 'metric'], default='imperial')
+    parser.add_argument('--base-url', default=FORECAST_URL, help='forecast endpoint (e.g. a local stub)')
+    parser.add_argument('--api-key', default=os.environ.get('OPENWEATHER_API_KEY'))
+    parser.add_argument('--workers', type=int, default=8, help='concurrent upstream requests')
+    parser.add_argument('--rate', type=float, help='upstream requests per second (default: per-host limit)')
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL, help='seconds a forecast window is cached')
+    parser.add_argument('--max-entries', type=int, default=DEFAULT_MAX_ENTRIES, help='cached (cell, date) windows')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging()
+    if not args.api_key:
+        raise SystemExit('Set OPENWEATHER_API_KEY or pass --api-key')
+    fetcher = ForecastFetcher(args.api_key, args.base_url, args.units, args.workers, args.rate)
+    service = WeatherService(load_stadiums(args.data_dir), fetcher, args.grid_deg,
+                             TTLCache(args.max_entries, args.ttl))
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+if __name__ == "__main__":
+    main()